@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import anyio
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,7 +11,56 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 print("DATABASE URL:", DATABASE_URL)  # TEMP DEBUG
 
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite connections are opened in request threads and reused by
+        # others; sizing knobs don't apply to its default pools.
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def make_engine(url: str):
+    return create_engine(url, **engine_options(url))
+
+
+def make_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options = engine_options(url)
+    options.pop("connect_args", None)
+    return create_async_engine(async_url(url), **options)
+
+
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -17,4 +68,36 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async_engine = make_async_engine(DATABASE_URL)
+    AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _fetch_sync(stmt, one: bool):
+    with SessionLocal() as db:
+        result = db.execute(stmt)
+        return result.first() if one else result.all()
+
+
+async def fetch_all(stmt) -> list:
+    """Run a read-only SELECT and return all rows.
+
+    Uses the async engine when DB_ASYNC is enabled, otherwise runs the
+    query on the sync engine in a worker thread.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(stmt)).all()
+    return await anyio.to_thread.run_sync(_fetch_sync, stmt, False)
+
+
+async def fetch_one(stmt):
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(stmt)).first()
+    return await anyio.to_thread.run_sync(_fetch_sync, stmt, True)
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+
+UPLOAD_DIR = "uploads"
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("KYC_RESULT_CACHE_MAX_ENTRIES", "10000"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("KYC_RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class DocumentStore:
+    """Content-addressed document store with a cache of verification results.
+
+    Documents live at ``objects/<sha[:2]>/<sha><ext>`` so re-uploading the
+    same scan is a no-op. Name-independent OCR and face results are cached
+    as JSON under ``results/`` keyed by ``result_key`` (the same hash plus
+    the analysis config that produced them) and evicted in LRU order once either the entry or byte budget is exceeded. Documents
+    themselves are never evicted.
+    """
+
+    def __init__(self, root: str, max_entries: int, max_bytes: int):
+        self.objects_dir = os.path.join(root, "objects")
+        self.results_dir = os.path.join(root, "results")
+        self.incoming_dir = os.path.join(root, "incoming")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] | None = None
+        self._index_bytes = 0
+
+    def _load_index(self) -> OrderedDict:
+        if self._index is None:
+            os.makedirs(self.results_dir, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.results_dir):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[: -len(".json")], stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._index_bytes = sum(self._index.values())
+        return self._index
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, f"{key}.json")
+
+    @staticmethod
+    def result_key(sha256: str, config: str) -> str:
+        return f"{sha256}.{config}"
+
+    def object_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}{ext}")
+
+    def incoming_path(self, ext: str) -> str:
+        return os.path.join(self.incoming_dir, f"{uuid.uuid4().hex}{ext}")
+
+    def adopt(self, incoming_path: str, sha256: str, ext: str) -> str:
+        """Move an ingested file into the store, dropping it if already stored."""
+        path = self.object_path(sha256, ext)
+        if os.path.exists(path):
+            os.remove(incoming_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(incoming_path, path)
+        return path
+
+    def get_result(self, key: str) -> dict | None:
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            path = self._result_path(key)
+            try:
+                with open(path) as f:
+                    result = json.load(f)
+                os.utime(path)
+            except (OSError, ValueError):
+                self._index_bytes -= index.pop(key)
+                return None
+            index.move_to_end(key)
+            return result
+
+    def put_result(self, key: str, result: dict) -> None:
+        data = json.dumps(result).encode()
+        with self._lock:
+            index = self._load_index()
+            path = self._result_path(key)
+            fd, tmp_path = tempfile.mkstemp(dir=self.results_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self._index_bytes -= index.pop(key, 0)
+            index[key] = len(data)
+            self._index_bytes += len(data)
+            self._evict(index)
+
+    def _evict(self, index: OrderedDict) -> None:
+        while index and (len(index) > self.max_entries or self._index_bytes > self.max_bytes):
+            key, size = index.popitem(last=False)
+            self._index_bytes -= size
+            try:
+                os.remove(self._result_path(key))
+            except FileNotFoundError:
+                pass
+
+
+document_store = DocumentStore(
+    root=UPLOAD_DIR,
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+)
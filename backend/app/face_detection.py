@@ -0,0 +1,60 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+FACE_MAX_DIMENSION = int(os.getenv("KYC_FACE_MAX_DIM", "800"))
+
+_local = threading.local()
+
+
+def _get_cascade() -> cv2.CascadeClassifier:
+    # CascadeClassifier is not safe to share across threads, so each thread
+    # parses the XML once and then keeps its own copy.
+    cascade = getattr(_local, "cascade", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(CASCADE_PATH)
+        if cascade.empty():
+            raise RuntimeError(f"Could not load face cascade from {CASCADE_PATH}")
+        _local.cascade = cascade
+    return cascade
+
+
+def detect_faces(
+    gray: np.ndarray,
+    max_dimension: int = FACE_MAX_DIMENSION,
+    scale_factor: float = 1.3,
+    min_neighbors: int = 5,
+) -> list[tuple[int, int, int, int]]:
+    """Return face boxes ``(x, y, w, h)`` in the coordinates of ``gray``.
+
+    Images larger than ``max_dimension`` on their longest side are
+    downscaled before detection and the boxes are scaled back up.
+    """
+    height, width = gray.shape[:2]
+    scale = 1.0
+    if max_dimension and max(height, width) > max_dimension:
+        scale = max_dimension / max(height, width)
+        gray = cv2.resize(
+            gray,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    faces = _get_cascade().detectMultiScale(
+        gray, scaleFactor=scale_factor, minNeighbors=min_neighbors
+    )
+
+    boxes = []
+    for x, y, w, h in faces:
+        boxes.append(
+            (
+                min(int(round(x / scale)), width - 1),
+                min(int(round(y / scale)), height - 1),
+                min(int(round(w / scale)), width),
+                min(int(round(h / scale)), height),
+            )
+        )
+    return boxes
@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from functools import cached_property
+
+import cv2
+import numpy as np
+
+
+class DecodedImage:
+    """A document decoded once into a NumPy array.
+
+    Derived variants (grayscale, binarized, deskewed) are computed on first
+    access and cached, so OCR and face detection share the same arrays
+    instead of each decoding the upload again. Time spent in every stage is
+    collected in ``timings_ms``.
+    """
+
+    def __init__(self, bgr: np.ndarray | None, timings_ms: dict[str, float] | None = None):
+        self.bgr = bgr
+        self.timings_ms: dict[str, float] = timings_ms if timings_ms is not None else {}
+
+    @classmethod
+    def decode(cls, content: "bytes | np.ndarray") -> "DecodedImage | None":
+        timings_ms: dict[str, float] = {}
+        start = time.perf_counter()
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            content = np.frombuffer(content, dtype="uint8")
+        bgr = cv2.imdecode(content, cv2.IMREAD_COLOR)
+        timings_ms["decode"] = round((time.perf_counter() - start) * 1000, 2)
+        if bgr is None:
+            return None
+        return cls(bgr, timings_ms)
+
+    @classmethod
+    def decode_file(cls, path: str) -> "DecodedImage | None":
+        try:
+            content = np.fromfile(path, dtype="uint8")
+        except OSError:
+            return None
+        return cls.decode(content)
+
+    @classmethod
+    def from_gray(cls, gray: np.ndarray) -> "DecodedImage":
+        """Wrap an already single-channel image, e.g. a rasterised PDF page."""
+        image = cls(None)
+        image.__dict__["gray"] = gray
+        return image
+
+    @contextmanager
+    def timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings_ms[stage] = round(self.timings_ms.get(stage, 0.0) + elapsed, 2)
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        with self.timed("grayscale"):
+            return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+
+    @cached_property
+    def binarized(self) -> np.ndarray:
+        gray = self.gray
+        with self.timed("binarize"):
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+            return binary
+
+    @cached_property
+    def skew_angle(self) -> float:
+        binary = self.binarized
+        with self.timed("deskew"):
+            points = cv2.findNonZero(cv2.bitwise_not(binary))
+            if points is None or len(points) < 10:
+                return 0.0
+            angle = cv2.minAreaRect(points)[-1]
+            # minAreaRect reports angles in [-90, 0) or (0, 90] depending on the
+            # OpenCV version; fold them into (-45, 45].
+            if angle > 45:
+                angle -= 90
+            elif angle <= -45:
+                angle += 90
+            return float(angle)
+
+    @cached_property
+    def deskewed(self) -> np.ndarray:
+        angle = self.skew_angle
+        gray = self.gray
+        if abs(angle) < 0.5:
+            return gray
+        with self.timed("deskew"):
+            height, width = gray.shape
+            matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+            return cv2.warpAffine(
+                gray,
+                matrix,
+                (width, height),
+                flags=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_REPLICATE,
+            )
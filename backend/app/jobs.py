@@ -0,0 +1,150 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from .ocr_engine import use_local_engine
+from .verification import analyse_document, build_verification
+
+VERIFY_WORKERS = int(os.getenv("KYC_VERIFY_WORKERS", str(os.cpu_count() or 1)))
+VERIFY_QUEUE_DEPTH = int(os.getenv("KYC_VERIFY_QUEUE_DEPTH", "32"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("KYC_JOB_RESULT_TTL", "900"))
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class VerificationJobQueue:
+    """Bounded queue of document verification jobs backed by a process pool.
+
+    ``max_depth`` caps queued plus running jobs; ``submit`` raises
+    ``QueueFullError`` once it is reached so the caller can shed load.
+    Finished jobs are kept for ``result_ttl`` seconds for polling.
+    """
+
+    def __init__(self, max_workers: int, max_depth: int, result_ttl: int):
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._executor: ProcessPoolExecutor | None = None
+        self._jobs: dict[str, dict] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=use_local_engine
+            )
+        return self._executor
+
+    def _drop_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Forget a pool whose worker died; the next submit starts a new one.
+
+        Call with ``_lock`` held.
+        """
+        if self._executor is executor:
+            logger.warning("Verification worker pool broke; starting a new one")
+            # Its pending jobs already failed with BrokenProcessPool. Cancelling
+            # here would run their callbacks, which take _lock, on this thread.
+            executor.shutdown(wait=False)
+            self._executor = None
+
+    def _expire_finished(self, now: float) -> None:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _on_done(self, job_id: str, future: Future, executor, on_result) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                self._drop_executor(executor)
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["finished_at"] = time.time()
+        if on_result is not None and not future.cancelled() and future.exception() is None:
+            on_result(future.result())
+
+    def submit(
+        self,
+        owner: str,
+        path: str,
+        ext: str,
+        name: str,
+        meta: dict,
+        on_result: Callable[[dict], None] | None = None,
+    ) -> str:
+        with self._lock:
+            self._expire_finished(time.time())
+            if self._in_flight >= self.max_depth:
+                raise QueueFullError()
+            self._in_flight += 1
+            job_id = uuid.uuid4().hex
+            try:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(analyse_document, path, ext)
+                except BrokenProcessPool:
+                    # A worker died (OOM, native crash) since the last job.
+                    self._drop_executor(executor)
+                    executor = self._get_executor()
+                    future = executor.submit(analyse_document, path, ext)
+            except Exception:
+                self._in_flight -= 1
+                raise
+            self._jobs[job_id] = {
+                "owner": owner,
+                "name": name,
+                "future": future,
+                "meta": meta,
+                "finished_at": None,
+            }
+        future.add_done_callback(lambda f: self._on_done(job_id, f, executor, on_result))
+        return job_id
+
+    def get(self, job_id: str, owner: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job["owner"] != owner:
+            return None
+
+        future: Future = job["future"]
+        response = {"job_id": job_id, **job["meta"]}
+        if not future.done():
+            response["status"] = "running" if future.running() else "queued"
+            return response
+
+        try:
+            analysis = future.result()
+        except Exception:
+            response["status"] = "failed"
+            response["detail"] = "Document verification failed"
+            return response
+
+        response["status"] = "done"
+        response["result"] = build_verification(analysis, job["name"])
+        return response
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+verification_queue = VerificationJobQueue(
+    max_workers=VERIFY_WORKERS,
+    max_depth=VERIFY_QUEUE_DEPTH,
+    result_ttl=JOB_RESULT_TTL_SECONDS,
+)
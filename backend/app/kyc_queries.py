@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from . import models
+
+# Risk bands follow the decision thresholds in scoring.py.
+RISK_BANDS = {
+    "low": (None, 40),
+    "medium": (40, 70),
+    "high": (70, None),
+}
+
+ADMIN_PAGE_DEFAULT = 50
+ADMIN_PAGE_MAX = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(submission_date: datetime, record_id: int) -> str:
+    payload = json.dumps([submission_date.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        submitted, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(submitted), int(record_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def kyc_filters(
+    status: str | None = None,
+    district: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    risk_band: str | None = None,
+) -> list:
+    clauses = []
+    if status:
+        clauses.append(models.KYC.status == status)
+    if district:
+        clauses.append(models.KYC.district == district)
+    if date_from:
+        clauses.append(models.KYC.submission_date >= date_from)
+    if date_to:
+        clauses.append(models.KYC.submission_date < date_to)
+    if risk_band:
+        low, high = RISK_BANDS[risk_band]
+        if low is not None:
+            clauses.append(models.KYC.risk_score >= low)
+        if high is not None:
+            clauses.append(models.KYC.risk_score < high)
+    return clauses
+
+
+def admin_page_query(filters: list, cursor: str | None, limit: int):
+    """Newest-first page of KYC records joined to their user's email.
+
+    Keyset pagination on ``(submission_date, id)``: the cursor holds the
+    last row of the previous page, so each page is an index range scan
+    regardless of how deep the client has paged.
+    """
+    stmt = (
+        select(
+            models.KYC.id,
+            models.User.email,
+            models.KYC.name,
+            models.KYC.district,
+            models.KYC.age,
+            models.KYC.risk_score,
+            models.KYC.status,
+            models.KYC.submission_date,
+            models.KYC.attempt_number,
+        )
+        .join(models.User, models.KYC.user_id == models.User.id)
+        .where(*filters)
+    )
+    if cursor:
+        submitted, record_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                models.KYC.submission_date < submitted,
+                and_(models.KYC.submission_date == submitted, models.KYC.id < record_id),
+            )
+        )
+    # One extra row tells us whether another page exists.
+    return stmt.order_by(models.KYC.submission_date.desc(), models.KYC.id.desc()).limit(limit + 1)
+
+
+def status_counts_query(filters: list):
+    return (
+        select(models.KYC.status, func.count())
+        .where(*filters)
+        .group_by(models.KYC.status)
+    )
+
+
+def build_page(rows: list, limit: int) -> tuple[list[dict], str | None]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    records = [
+        {
+            "id": row.id,
+            "email": row.email,
+            "name": row.name,
+            "district": row.district,
+            "age": row.age,
+            "risk_score": row.risk_score,
+            "status": row.status,
+            "submission_date": row.submission_date.isoformat() if row.submission_date else None,
+            "attempt_number": row.attempt_number,
+        }
+        for row in rows
+    ]
+    next_cursor = None
+    if has_more and rows[-1].submission_date is not None:
+        next_cursor = encode_cursor(rows[-1].submission_date, rows[-1].id)
+    return records, next_cursor
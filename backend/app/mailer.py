@@ -0,0 +1,269 @@
+"""Transactional email outbox.
+
+Request handlers only insert an ``email_outbox`` row in the same
+transaction as the KYC record they write. ``OutboxWorker`` drains due rows
+in batches over one authenticated SMTP connection that is kept open
+between batches, and retries failures with exponential backoff.
+
+For local testing run a debugging SMTP server and point the worker at it:
+
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false SMTP_AUTH=false python -m app.mailer drain
+"""
+import argparse
+import logging
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+EMAIL_SENDER = os.getenv("EMAIL_SENDER")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+# Set false only for a relay that accepts mail without logging in.
+SMTP_AUTH = os.getenv("SMTP_AUTH", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "2"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+
+def email_enabled() -> bool:
+    # Without credentials every send would fail; treat email as switched off.
+    return bool(EMAIL_SENDER) and (bool(EMAIL_PASSWORD) or not SMTP_AUTH)
+
+
+def render_kyc_email(name: str, status: str, risk_score: int, reasons: list[str]) -> tuple[str, str]:
+    subject = "SecureKYC-AI — Your KYC Application Status"
+
+    if status == "APPROVED":
+        next_steps = "Your account is ready. Welcome!"
+        status_text = "APPROVED"
+    elif status == "REVIEW":
+        next_steps = "Our team will contact you within 2 business days."
+        status_text = "UNDER REVIEW"
+    else:
+        next_steps = "You may reapply after correcting the flagged issues."
+        status_text = "REJECTED"
+
+    reasons_text = "\n".join(f"- {r}" for r in reasons) if reasons else "No issues were flagged."
+
+    body = f"""Hello {name},
+
+Your KYC application status: {status_text}
+
+Risk score: {risk_score}
+
+Reasons flagged:
+{reasons_text}
+
+Next steps:
+{next_steps}
+
+Thank you,
+SecureKYC-AI"""
+    return subject, body
+
+
+def enqueue_kyc_email(
+    db: Session, email: str, name: str, status: str, risk_score: int, reasons: list[str]
+) -> None:
+    """Add a status email to the outbox; it is sent once the caller commits."""
+    if not email_enabled() or not email:
+        return
+    subject, body = render_kyc_email(name, status, risk_score, reasons)
+    db.add(
+        models.EmailOutbox(
+            recipient=email,
+            subject=subject,
+            body=body,
+            status="PENDING",
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+class SmtpConnection:
+    """One SMTP session reused across messages until idle or broken."""
+
+    def __init__(self):
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+        if SMTP_STARTTLS:
+            server.starttls()
+        if SMTP_AUTH:
+            server.login(EMAIL_SENDER, EMAIL_PASSWORD)
+        return server
+
+    def get(self) -> smtplib.SMTP:
+        if self._server is not None:
+            idle = time.monotonic() - self._last_used
+            try:
+                if idle > SMTP_IDLE_SECONDS or self._server.noop()[0] != 250:
+                    self.close()
+            except smtplib.SMTPException:
+                self.close()
+        if self._server is None:
+            self._server = self._connect()
+        self._last_used = time.monotonic()
+        return self._server
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+def _message(row: models.EmailOutbox) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = EMAIL_SENDER
+    msg["To"] = row.recipient
+    msg["Subject"] = row.subject
+    msg.attach(MIMEText(row.body, "plain"))
+    return msg
+
+
+def _schedule_retry(row: models.EmailOutbox, error: str, now: datetime) -> None:
+    row.attempts += 1
+    row.last_error = error[:500]
+    if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+        row.status = "FAILED"
+        return
+    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (row.attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+    row.next_attempt_at = now + timedelta(seconds=delay)
+
+
+def drain_once(db: Session, connection: SmtpConnection, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Send one batch of due messages; returns how many rows were processed."""
+    now = datetime.now(timezone.utc)
+    rows = (
+        db.execute(
+            select(models.EmailOutbox)
+            .where(
+                models.EmailOutbox.status == "PENDING",
+                models.EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(models.EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    if not rows:
+        db.rollback()
+        return 0
+
+    try:
+        server = connection.get()
+    except (smtplib.SMTPException, OSError) as exc:
+        for row in rows:
+            _schedule_retry(row, f"connect: {exc!r}", now)
+        db.commit()
+        return len(rows)
+
+    for row in rows:
+        try:
+            server.send_message(_message(row))
+        except smtplib.SMTPRecipientsRefused as exc:
+            row.attempts += 1
+            row.status = "FAILED"
+            row.last_error = repr(exc)[:500]
+        except (smtplib.SMTPException, OSError) as exc:
+            connection.close()
+            _schedule_retry(row, repr(exc), now)
+            try:
+                server = connection.get()
+            except (smtplib.SMTPException, OSError):
+                for remaining in rows[rows.index(row) + 1:]:
+                    _schedule_retry(remaining, f"connect: {exc!r}", now)
+                break
+        else:
+            row.status = "SENT"
+            row.attempts += 1
+            row.sent_at = datetime.now(timezone.utc)
+    db.commit()
+    return len(rows)
+
+
+class OutboxWorker:
+    def __init__(self, poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None and email_enabled():
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=SMTP_TIMEOUT_SECONDS)
+            self._thread = None
+
+    def _run(self) -> None:
+        connection = SmtpConnection()
+        try:
+            while not self._stop.is_set():
+                try:
+                    with SessionLocal() as db:
+                        processed = drain_once(db, connection)
+                except Exception:
+                    logger.exception("Email outbox worker error")
+                    processed = 0
+                if processed == 0:
+                    self._stop.wait(self.poll_seconds)
+        finally:
+            connection.close()
+
+
+outbox_worker = OutboxWorker()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["drain"], help="send every due message, then exit")
+    parser.parse_args()
+
+    connection = SmtpConnection()
+    total = 0
+    try:
+        with SessionLocal() as db:
+            while True:
+                processed = drain_once(db, connection)
+                if processed == 0:
+                    break
+                total += processed
+    finally:
+        connection.close()
+    print(f"Processed {total} outbox messages")
+
+
+if __name__ == "__main__":
+    main()
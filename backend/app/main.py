@@ -1,23 +1,50 @@
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from .security import SECRET_KEY, ALGORITHM
-from fastapi import FastAPI, Depends, HTTPException, File, UploadFile
+from jose import JWTError
+from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from .database import engine, Base, SessionLocal
-from .security import hash_password, verify_password, create_access_token
+from .database import engine, SessionLocal, fetch_all, fetch_one
+from .migrations import upgrade
+from .security import (
+    hash_password,
+    verify_and_update_password,
+    create_access_token,
+    decode_access_token,
+)
 from . import models
-from .uidai_risk import get_district_risk_score
-import shutil, os, io, re, smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from .scoring import calculate_kyc_decision, score_applicants
+from .kyc_queries import (
+    ADMIN_PAGE_DEFAULT,
+    ADMIN_PAGE_MAX,
+    RISK_BANDS,
+    InvalidCursor,
+    admin_page_query,
+    build_page,
+    kyc_filters,
+    status_counts_query,
+)
+from .summary import (
+    admin_summary_query,
+    build_admin_summary,
+    ensure_summary,
+    record_change,
+)
+from .rescore import RESCORE_CHUNK_ROWS, claim_job, get_checkpoint, run_rescore_job
+from .verification import ANALYSIS_CONFIG, analyse_document, build_verification, is_cacheable
+from .doc_store import document_store
+from .metrics import counters
+from .uploads import ingest_upload, UploadRejected, UploadSizeLimitMiddleware
+from .jobs import verification_queue, QueueFullError
+from .ocr_engine import close_ocr_engine
+from .mailer import enqueue_kyc_email, outbox_worker
+from .rate_limit import auth_rate_limiter, client_address
+import itertools, os
+from collections import Counter
+import anyio
 from datetime import datetime
 
-import pytesseract
-from PIL import Image
-import cv2
-import numpy as np
-
 app = FastAPI()
 
 app.add_middleware(
@@ -27,59 +54,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadSizeLimitMiddleware, paths=("/kyc/upload",))
 
-Base.metadata.create_all(bind=engine)
-
-
-def send_kyc_email(email: str, name: str, status: str, risk_score: int, reasons: list[str]) -> None:
-    sender = os.getenv("EMAIL_SENDER")
-    password = os.getenv("EMAIL_PASSWORD")
-    if not sender or not password or not email:
-        return
-
-    subject = "SecureKYC-AI — Your KYC Application Status"
+# Every worker runs this at import; upgrade serialises them with a lock.
+upgrade(engine)
 
-    if status == "APPROVED":
-        next_steps = "Your account is ready. Welcome!"
-        status_text = "APPROVED"
-    elif status == "REVIEW":
-        next_steps = "Our team will contact you within 2 business days."
-        status_text = "UNDER REVIEW"
-    else:
-        next_steps = "You may reapply after correcting the flagged issues."
-        status_text = "REJECTED"
-
-    reasons_text = "\n".join(f"- {r}" for r in reasons) if reasons else "No issues were flagged."
-
-    body = f"""Hello {name},
-
-Your KYC application status: {status_text}
+with SessionLocal() as _db:
+    ensure_summary(_db)
 
-Risk score: {risk_score}
 
-Reasons flagged:
-{reasons_text}
+@app.on_event("startup")
+def start_outbox_worker():
+    outbox_worker.start()
 
-Next steps:
-{next_steps}
 
-Thank you,
-SecureKYC-AI"""
+@app.on_event("shutdown")
+def shutdown_verification_queue():
+    verification_queue.shutdown()
+    close_ocr_engine()
+    outbox_worker.stop()
 
-    msg = MIMEMultipart()
-    msg["From"] = sender
-    msg["To"] = email
-    msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
-
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender, password)
-            server.send_message(msg)
-    except Exception:
-        # Fail silently so email problems don't break API
-        pass
 
 def get_db():
     db = SessionLocal()
@@ -90,12 +84,12 @@ def get_db():
 
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     token = credentials.credentials
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
@@ -107,8 +101,35 @@ def get_current_user(
 def root():
     return {"message": "SecureKYC Backend Running Successfully"}
 
+def _client_ip(request: Request) -> str | None:
+    peer = request.client.host if request.client else None
+    return client_address(peer, request.headers.get("x-forwarded-for"))
+
+
+def _reject_rate_limited(action: str, rejected: tuple[str, int] | None) -> None:
+    if rejected is None:
+        return
+    bucket, retry_after = rejected
+    counters.increment(f"rate_limited_{action}_{bucket}")
+    raise HTTPException(
+        status_code=429,
+        detail="Too many attempts. Please retry shortly.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+# Both run before any database or bcrypt work so a burst is shed cheaply.
+def _enforce_auth_rate(request: Request, action: str, email: str) -> None:
+    _reject_rate_limited(action, auth_rate_limiter.check(action, _client_ip(request), email))
+
+
+async def _enforce_auth_rate_async(request: Request, action: str, email: str) -> None:
+    _reject_rate_limited(action, await auth_rate_limiter.check_async(action, _client_ip(request), email))
+
+
 @app.post("/register")
-def register_user(email: str, password: str, db: Session = Depends(get_db)):
+def register_user(request: Request, email: str, password: str, db: Session = Depends(get_db)):
+    _enforce_auth_rate(request, "register", email)
     existing_user = db.query(models.User).filter(models.User.email == email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -119,13 +140,30 @@ def register_user(email: str, password: str, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return {"message": "User registered successfully"}
 
+def _store_password_hash(user_id: int, hashed_password: str) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(hashed_password=hashed_password)
+        )
+        db.commit()
+
+
 @app.post("/login")
-def login_user(email: str, password: str, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == email).first()
+async def login_user(request: Request, email: str, password: str):
+    await _enforce_auth_rate_async(request, "login", email)
+    user = await fetch_one(
+        select(models.User.id, models.User.hashed_password, models.User.is_admin)
+        .where(models.User.email == email)
+    )
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=400, detail="Invalid credentials")
+    if new_hash:
+        await anyio.to_thread.run_sync(_store_password_hash, user.id, new_hash)
     access_token = create_access_token(data={"sub": str(user.id)})
     return {
         "access_token": access_token,
@@ -137,10 +175,18 @@ def login_user(email: str, password: str, db: Session = Depends(get_db)):
 def protected_route(current_user: str = Depends(get_current_user)):
     return {"message": "You are authenticated", "user_id": current_user}
 
+def _on_analysis(result_key: str, analysis: dict) -> None:
+    for ocr_path in analysis["ocr_paths"]:
+        counters.increment(f"ocr_path_{ocr_path}")
+    if is_cacheable(analysis):
+        document_store.put_result(result_key, {**analysis, "timings_ms": {}})
+
 @app.post("/kyc/upload")
 def upload_document(
+    response: Response,
     file: UploadFile = File(...),
     name: str = "",
+    async_mode: bool = False,
     current_user: str = Depends(get_current_user)
 ):
     allowed_extensions = [".jpg", ".jpeg", ".png", ".pdf"]
@@ -152,139 +198,69 @@ def upload_document(
     if file.content_type not in allowed_mimes:
         raise HTTPException(status_code=400, detail="Invalid file format detected.")
 
-    content = file.file.read()
-
-    if len(content) > 2 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large. Maximum size is 2MB.")
-
-    if len(content) == 0:
-        raise HTTPException(status_code=400, detail="File is empty or corrupted.")
-
-    jpeg_magic = content[:3] == b'\xff\xd8\xff'
-    png_magic = content[:8] == b'\x89PNG\r\n\x1a\n'
-    pdf_magic = content[:4] == b'%PDF'
-
-    if ext in [".jpg", ".jpeg"] and not jpeg_magic:
-        raise HTTPException(status_code=400, detail="File is not a valid JPEG image.")
-    if ext == ".png" and not png_magic:
-        raise HTTPException(status_code=400, detail="File is not a valid PNG image.")
-    if ext == ".pdf" and not pdf_magic:
-        raise HTTPException(status_code=400, detail="File is not a valid PDF.")
-
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = f"{upload_dir}/{current_user}_{file.filename}"
-
-    with open(file_path, "wb") as buffer:
-        buffer.write(content)
-
-    ocr_text = ""
-    aadhaar_found = False
-    name_found = False
-    flags: list[str] = []
-
-    if ext in [".jpg", ".jpeg", ".png"]:
-        try:
-            image = Image.open(io.BytesIO(content))
-            ocr_text = pytesseract.image_to_string(image)
-            match = re.search(r"\b\d{12}\b", ocr_text)
-            if match:
-                aadhaar_found = True
-            if name:
-                normalized_name = name.strip().lower()
-                if normalized_name in ocr_text.lower():
-                    name_found = True
-        except Exception:
-            flags.append("OCR processing failed")
-    else:
-        flags.append("OCR not run for non-image document")
+    try:
+        upload = ingest_upload(file.file, ext, document_store.incoming_path(ext))
+    except UploadRejected as exc:
+        raise HTTPException(status_code=400, detail=exc.detail)
+    document_path = document_store.adopt(upload.path, upload.sha256, ext)
 
-    if not aadhaar_found:
-        flags.append("No Aadhaar number detected in document")
-    if name and not name_found:
-        flags.append("Name mismatch between form and document")
+    upload_meta = {
+        "filename": file.filename,
+        "size_kb": round(upload.size / 1024, 2),
+        "sha256": upload.sha256,
+        "format_verified": True,
+    }
 
-    face_detected = False
-    face_message = "Face detection not run"
-    if ext in [".jpg", ".jpeg", ".png"]:
+    result_key = document_store.result_key(upload.sha256, ANALYSIS_CONFIG)
+    cached = document_store.get_result(result_key)
+    if cached is not None:
+        return {
+            "message": "Document uploaded and verified successfully",
+            **upload_meta,
+            "cached": True,
+            **build_verification(cached, name),
+        }
+
+    if async_mode:
         try:
-            image_cv = cv2.imdecode(
-                np.frombuffer(content, dtype="uint8"), cv2.IMREAD_COLOR  # type: ignore[name-defined]
+            job_id = verification_queue.submit(
+                owner=current_user,
+                path=document_path,
+                ext=ext,
+                name=name,
+                meta=upload_meta,
+                on_result=lambda analysis: _on_analysis(result_key, analysis),
             )
-        except Exception:
-            image_cv = None
-
-        if image_cv is not None:
-            gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
-            cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-            face_cascade = cv2.CascadeClassifier(cascade_path)
-            faces = face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
-            if len(faces) > 0:
-                face_detected = True
-                face_message = "Face detected in document"
-            else:
-                face_message = "No face detected in document - may not be a valid ID"
-                flags.append("No face detected in document - may not be a valid ID")
+        except QueueFullError:
+            raise HTTPException(
+                status_code=429,
+                detail="Verification queue is full. Please retry shortly.",
+            )
+        response.status_code = 202
+        return {
+            "message": "Document uploaded, verification queued",
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/kyc/upload/jobs/{job_id}",
+        }
+
+    analysis = analyse_document(document_path, ext)
+    _on_analysis(result_key, analysis)
 
     return {
         "message": "Document uploaded and verified successfully",
-        "filename": file.filename,
-        "size_kb": round(len(content) / 1024, 2),
-        "format_verified": True,
-        "ocr_text": ocr_text,
-        "aadhaar_found": aadhaar_found,
-        "name_found": name_found,
-        "flags": flags,
-        "face_detected": face_detected,
-        "face_message": face_message,
+        **upload_meta,
+        "cached": False,
+        **build_verification(analysis, name),
     }
 
-def _calculate_kyc_decision(name: str, aadhaar_number: str, district: str, age: int) -> tuple[int, str, list[str], int]:
-    risk_score = 0
-    reasons: list[str] = []
-
-    if len(name.strip()) < 3:
-        risk_score += 40
-        reasons.append("Invalid name - too short")
-
-    if not name.replace(" ", "").isalpha():
-        risk_score += 40
-        reasons.append("Invalid name - contains numbers or symbols")
-
-    if len(aadhaar_number) != 12 or not aadhaar_number.isdigit():
-        risk_score += 40
-        reasons.append("Invalid Aadhaar format")
-
-    if age < 18:
-        risk_score += 30
-        reasons.append("Applicant is underage")
-
-    district_pattern = {
-        "Chennai": "11",
-        "Mumbai": "22",
-        "Delhi": "33",
-    }
-    expected_prefix = district_pattern.get(district)
-    if expected_prefix and not aadhaar_number.startswith(expected_prefix):
-        risk_score += 30
-        reasons.append("District-Aadhaar mismatch")
-
-    uidai_score = get_district_risk_score(district)
-    if uidai_score == 25:
-        risk_score += uidai_score
-        reasons.append("High risk district based on UIDAI enrollment data")
-    elif uidai_score == 15:
-        risk_score += uidai_score
-        reasons.append("District not in UIDAI dataset - unverified region")
-
-    if risk_score >= 70:
-        status = "REJECTED"
-    elif risk_score >= 40:
-        status = "REVIEW"
-    else:
-        status = "APPROVED"
 
-    return risk_score, status, reasons, uidai_score
+@app.get("/kyc/upload/jobs/{job_id}")
+def get_upload_job(job_id: str, current_user: str = Depends(get_current_user)):
+    job = verification_queue.get(job_id, owner=current_user)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Verification job not found")
+    return job
 
 
 @app.post("/kyc/submit")
@@ -300,11 +276,13 @@ def submit_kyc(
     current_user: str = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    risk_score, status, reasons, uidai_score = _calculate_kyc_decision(
+    submitted_at = datetime.utcnow()
+    risk_score, status, reasons, uidai_score = calculate_kyc_decision(
         name=name,
         aadhaar_number=aadhaar_number,
         district=district,
         age=age,
+        at=submitted_at,
     )
 
     if not ocr_aadhaar_found:
@@ -328,12 +306,12 @@ def submit_kyc(
         face_detected=face_detected,
     )
     db.add(kyc_record)
-    db.commit()
-    db.refresh(kyc_record)
+    record_change(db, None, (status, risk_score))
 
     user = db.query(models.User).filter(models.User.id == int(current_user)).first()
     if user:
-        send_kyc_email(
+        enqueue_kyc_email(
+            db,
             email=user.email,
             name=name,
             status=status,
@@ -341,6 +319,9 @@ def submit_kyc(
             reasons=reasons,
         )
 
+    db.commit()
+    db.refresh(kyc_record)
+
     return {
         "verification_status": status,
         "risk_score": risk_score,
@@ -351,22 +332,23 @@ def submit_kyc(
 
 
 @app.get("/kyc/history")
-def get_kyc_history(
+async def get_kyc_history(
     current_user: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
 ):
-    records = (
-        db.query(models.KYC)
-        .filter(models.KYC.user_id == int(current_user))
+    user_id = int(current_user)
+    records = await fetch_all(
+        select(models.KYC)
+        .where(models.KYC.user_id == user_id)
         .order_by(models.KYC.submission_date.desc())
-        .all()
     )
+    # A user has a handful of records; count the ones already fetched.
+    counts = Counter(r.status for (r,) in records)
 
     return {
-        "total": len(records),
-        "approved": len([r for r in records if r.status == "APPROVED"]),
-        "review": len([r for r in records if r.status == "REVIEW"]),
-        "rejected": len([r for r in records if r.status == "REJECTED"]),
+        "total": sum(counts.values()),
+        "approved": counts.get("APPROVED", 0),
+        "review": counts.get("REVIEW", 0),
+        "rejected": counts.get("REJECTED", 0),
         "records": [
             {
                 "name": r.name,
@@ -376,21 +358,20 @@ def get_kyc_history(
                 "status": r.status,
                 "attempt_number": r.attempt_number,
                 "submission_date": r.submission_date.isoformat() if r.submission_date else None,
-            } for r in records
+            } for (r,) in records
         ]
     }
 
 
 @app.get("/kyc/status")
-def get_kyc_status(
+async def get_kyc_status(
     current_user: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    record = (
-        db.query(models.KYC)
-        .filter(models.KYC.user_id == int(current_user))
+    record = await fetch_one(
+        select(models.KYC.status, models.KYC.attempt_number)
+        .where(models.KYC.user_id == int(current_user))
         .order_by(models.KYC.submission_date.desc())
-        .first()
+        .limit(1)
     )
     if not record:
         raise HTTPException(status_code=404, detail="No KYC record found")
@@ -430,11 +411,13 @@ def resubmit_kyc(
 
     latest_rejected = rejected_records[0] if rejected_records else None
 
-    risk_score, status, reasons, uidai_score = _calculate_kyc_decision(
+    submitted_at = datetime.utcnow()
+    risk_score, status, reasons, uidai_score = calculate_kyc_decision(
         name=name,
         aadhaar_number=aadhaar_number,
         district=district,
         age=age,
+        at=submitted_at,
     )
 
     if not ocr_aadhaar_found:
@@ -445,13 +428,18 @@ def resubmit_kyc(
         reasons.append("No face confirmed in document by detector")
 
     if latest_rejected:
+        record_change(
+            db,
+            (latest_rejected.status, latest_rejected.risk_score),
+            (status, risk_score),
+        )
         latest_rejected.name = name
         latest_rejected.aadhaar_number = aadhaar_number
         latest_rejected.district = district
         latest_rejected.age = age
         latest_rejected.risk_score = risk_score
         latest_rejected.status = status
-        latest_rejected.submission_date = datetime.utcnow()
+        latest_rejected.submission_date = submitted_at
         latest_rejected.attempt_number = min(
             (latest_rejected.attempt_number or 1) + 1,
             3,
@@ -477,13 +465,12 @@ def resubmit_kyc(
             face_detected=face_detected,
         )
         db.add(kyc_record)
-
-    db.commit()
-    db.refresh(kyc_record)
+        record_change(db, None, (status, risk_score))
 
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user:
-        send_kyc_email(
+        enqueue_kyc_email(
+            db,
             email=user.email,
             name=name,
             status=status,
@@ -491,6 +478,9 @@ def resubmit_kyc(
             reasons=reasons,
         )
 
+    db.commit()
+    db.refresh(kyc_record)
+
     return {
         "verification_status": status,
         "risk_score": risk_score,
@@ -501,40 +491,149 @@ def resubmit_kyc(
 
 
 @app.get("/admin/all-kyc")
-def get_all_kyc(
+async def get_all_kyc(
+    limit: int = ADMIN_PAGE_DEFAULT,
+    cursor: str | None = None,
+    status: str | None = None,
+    district: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    risk_band: str | None = None,
+    current_user: str = Depends(get_current_user),
+):
+    await _require_admin_async(current_user)
+
+    if not 1 <= limit <= ADMIN_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {ADMIN_PAGE_MAX}")
+    if risk_band and risk_band not in RISK_BANDS:
+        raise HTTPException(status_code=400, detail="risk_band must be low, medium or high")
+
+    filters = kyc_filters(status, district, date_from, date_to, risk_band)
+    try:
+        rows = await fetch_all(admin_page_query(filters, cursor, limit))
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    records, next_cursor = build_page(rows, limit)
+
+    # Headline counts break down by status, so they ignore the status filter.
+    # Unfiltered counts come from the maintained summary table.
+    count_filters = kyc_filters(None, district, date_from, date_to, risk_band)
+    if count_filters:
+        counts = dict(await fetch_all(status_counts_query(count_filters)))
+        headline = {
+            "total": sum(counts.values()),
+            "approved": counts.get("APPROVED", 0),
+            "review": counts.get("REVIEW", 0),
+            "rejected": counts.get("REJECTED", 0),
+        }
+    else:
+        summary = build_admin_summary(await fetch_all(admin_summary_query()))
+        headline = {key: summary[key] for key in ("total", "approved", "review", "rejected")}
+
+    return {
+        **headline,
+        "records": records,
+        "next_cursor": next_cursor,
+    }
+
+
+@app.get("/admin/summary")
+async def get_admin_summary(
     current_user: str = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
+    await _require_admin_async(current_user)
+    return build_admin_summary(await fetch_all(admin_summary_query()))
+
+
+def _require_admin(db: Session, current_user: str) -> models.User:
     user = db.query(models.User).filter(models.User.id == int(current_user)).first()
     if not user or not user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
+    return user
 
-    records = (
-        db.query(models.KYC, models.User)
-        .join(models.User, models.KYC.user_id == models.User.id)
-        .order_by(models.KYC.submission_date.desc())
-        .all()
-    )
 
-    flattened = []
-    for kyc, u in records:
-        flattened.append(
-            {
-                "email": u.email,
-                "name": kyc.name,
-                "district": kyc.district,
-                "age": kyc.age,
-                "risk_score": kyc.risk_score,
-                "status": kyc.status,
-                "submission_date": kyc.submission_date.isoformat() if kyc.submission_date else None,
-                "attempt_number": kyc.attempt_number,
-            }
-        )
+async def _require_admin_async(current_user: str) -> None:
+    is_admin = await fetch_one(select(models.User.is_admin).where(models.User.id == int(current_user)))
+    if not is_admin or not is_admin[0]:
+        raise HTTPException(status_code=403, detail="Admin access required")
 
+
+BATCH_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+@app.post("/admin/kyc/batch-score")
+def batch_score_kyc(
+    file: UploadFile = File(...),
+    output: str = "jsonl",
+    current_user: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _require_admin(db, current_user)
+
+    fmt = BATCH_FORMATS.get(os.path.splitext(file.filename)[1].lower())
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only CSV, JSON lines, Parquet allowed.")
+    if output not in ("jsonl", "csv"):
+        raise HTTPException(status_code=400, detail="Output must be jsonl or csv.")
+
+    decisions = score_applicants(file.file, fmt, output=output, at=datetime.utcnow())
+    try:
+        first = next(decisions, "")
+    except (ValueError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    media_type = "text/csv" if output == "csv" else "application/x-ndjson"
+    return StreamingResponse(itertools.chain([first], decisions), media_type=media_type)
+
+
+@app.post("/admin/rescore")
+def start_rescore(
+    background_tasks: BackgroundTasks,
+    job_name: str = "default",
+    chunk_size: int = RESCORE_CHUNK_ROWS,
+    restart: bool = False,
+    current_user: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _require_admin(db, current_user)
+    if not claim_job(job_name):
+        raise HTTPException(status_code=409, detail="Rescore job is already running")
+    background_tasks.add_task(run_rescore_job, job_name, chunk_size, restart)
+    return {"message": "Rescore job started", "job_name": job_name}
+
+
+@app.get("/admin/rescore/{job_name}")
+def get_rescore_status(
+    job_name: str,
+    current_user: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _require_admin(db, current_user)
+    checkpoint = get_checkpoint(db, job_name)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Rescore job not found")
     return {
-        "total": len(flattened),
-        "approved": len([r for r in flattened if r["status"] == "APPROVED"]),
-        "review": len([r for r in flattened if r["status"] == "REVIEW"]),
-        "rejected": len([r for r in flattened if r["status"] == "REJECTED"]),
-        "records": flattened,
-    }
\ No newline at end of file
+        "job_name": checkpoint.job_name,
+        "last_id": checkpoint.last_id,
+        "rows_scanned": checkpoint.rows_scanned,
+        "rows_updated": checkpoint.rows_updated,
+        "started_at": checkpoint.started_at.isoformat() if checkpoint.started_at else None,
+        "updated_at": checkpoint.updated_at.isoformat() if checkpoint.updated_at else None,
+        "finished_at": checkpoint.finished_at.isoformat() if checkpoint.finished_at else None,
+    }
+
+
+@app.get("/admin/metrics")
+def get_metrics(
+    current_user: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _require_admin(db, current_user)
+
+    counts = counters.snapshot()
+    roi_hits = counts.get("ocr_path_roi", 0)
+    roi_attempts = roi_hits + counts.get("ocr_path_roi_fallback", 0)
+    return {
+        "counters": counts,
+        "ocr_roi_hit_rate": round(roi_hits / roi_attempts, 3) if roi_attempts else None,
+    }
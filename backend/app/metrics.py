@@ -0,0 +1,21 @@
+import threading
+from collections import Counter
+
+
+class Counters:
+    """Thread-safe in-process counters exposed through ``/admin/metrics``."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+counters = Counters()
@@ -0,0 +1,427 @@
+"""Versioned schema migrations.
+
+Each migration runs once, in order, inside its own transaction and is
+recorded in ``schema_migrations``. A migration that commits part-way (to
+release a lock early) must be safe to run again from the start. Add new migrations to the end of
+``MIGRATIONS``; never renumber or edit one that has shipped.
+
+    python -m app.migrations upgrade
+    python -m app.migrations status
+    python -m app.migrations check-plans [--database-url URL] [--rows N]
+
+``check-plans`` seeds a scratch database (a temporary SQLite file by
+default), runs EXPLAIN on the hot user and admin queries and exits
+non-zero if any of them fully scans a table or sorts its rows.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: SQLite upgrades are not serialised.
+    fcntl = None
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from . import models
+from .kyc_queries import admin_page_query, encode_cursor, kyc_filters, status_counts_query
+from .summary import admin_summary_query
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+# Migrations define the tables they create as they were when the migration
+# shipped, so later model changes never alter what an old revision does.
+
+_KYC_RECORDS_INDEXES = {
+    "ix_kyc_records_user_id_submission_date": ("user_id", "submission_date"),
+    "ix_kyc_records_status_submission_date": ("status", "submission_date"),
+    "ix_kyc_records_submission_date_id": ("submission_date", "id"),
+}
+
+
+def _baseline(conn: Connection) -> None:
+    # Databases created before migrations existed already have some of these
+    # tables; create_all only adds the missing ones.
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("hashed_password", String, nullable=False),
+        Column("is_admin", Boolean, nullable=False),
+    )
+    Table(
+        "kyc_records",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id", name="fk_kyc_records_user_id"), nullable=False),
+        Column("name", String, nullable=False),
+        Column("aadhaar_number", String, nullable=False),
+        Column("district", String, nullable=False),
+        Column("age", Integer, nullable=False),
+        Column("risk_score", Integer),
+        Column("status", String),
+        Column("submission_date", DateTime(timezone=True), server_default=func.now()),
+        Column("attempt_number", Integer, nullable=False),
+        Column("ocr_aadhaar_found", Boolean, nullable=False),
+        Column("ocr_name_found", Boolean, nullable=False),
+        Column("ocr_flags", String),
+        Column("face_detected", Boolean, nullable=False),
+        *(Index(name, *columns) for name, columns in _KYC_RECORDS_INDEXES.items()),
+    )
+    Table(
+        "rescore_checkpoints",
+        metadata,
+        Column("job_name", String, primary_key=True),
+        Column("last_id", Integer, nullable=False),
+        Column("rows_scanned", Integer, nullable=False),
+        Column("rows_updated", Integer, nullable=False),
+        Column("started_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+        Column("finished_at", DateTime(timezone=True)),
+    )
+    Table(
+        "kyc_status_summary",
+        metadata,
+        Column("status", String, primary_key=True),
+        Column("risk_bucket", Integer, primary_key=True),
+        Column("count", Integer, nullable=False),
+    )
+    metadata.create_all(bind=conn)
+
+
+def _kyc_records_indexes(conn: Connection) -> None:
+    kyc_records = Table("kyc_records", MetaData(), autoload_with=conn)
+    for name, columns in _KYC_RECORDS_INDEXES.items():
+        Index(name, *(kyc_records.c[column] for column in columns)).create(bind=conn, checkfirst=True)
+
+
+def _kyc_records_user_fk(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        # SQLite cannot add a constraint to an existing table; new SQLite
+        # databases get the foreign key from the baseline.
+        return
+    existing = {fk["name"] for fk in inspect(conn).get_foreign_keys("kyc_records")}
+    if "fk_kyc_records_user_id" not in existing:
+        # NOT VALID skips the full-table check while ACCESS EXCLUSIVE is held.
+        # Committing releases that lock before VALIDATE scans the table under
+        # SHARE UPDATE EXCLUSIVE, which lets reads and writes continue.
+        conn.execute(
+            text(
+                "ALTER TABLE kyc_records ADD CONSTRAINT fk_kyc_records_user_id "
+                "FOREIGN KEY (user_id) REFERENCES users (id) NOT VALID"
+            )
+        )
+        conn.commit()
+    # Also runs on a retry after a failed validation; on a valid constraint it
+    # is a no-op.
+    conn.execute(text("ALTER TABLE kyc_records VALIDATE CONSTRAINT fk_kyc_records_user_id"))
+
+
+def _email_outbox(conn: Connection) -> None:
+    email_outbox = Table(
+        "email_outbox",
+        MetaData(),
+        Column("id", Integer, primary_key=True, index=True),
+        Column("recipient", String, nullable=False),
+        Column("subject", String, nullable=False),
+        Column("body", String, nullable=False),
+        Column("status", String, nullable=False),
+        Column("attempts", Integer, nullable=False),
+        Column("next_attempt_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        Column("last_error", String),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("sent_at", DateTime(timezone=True)),
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    email_outbox.create(bind=conn, checkfirst=True)
+    for index in email_outbox.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+_SERVER_DEFAULT_TIMESTAMPS = {
+    "kyc_records": ["submission_date"],
+    "rescore_checkpoints": ["started_at", "updated_at"],
+    "email_outbox": ["next_attempt_at", "created_at"],
+}
+
+
+def _sqlite_timestamp_format(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    # Rows written by CURRENT_TIMESTAMP lack the fractional seconds that bound
+    # datetimes carry; rewrite them so text order is time order (models.utc_now).
+    existing = set(inspect(conn).get_table_names())
+    for table, columns in _SERVER_DEFAULT_TIMESTAMPS.items():
+        if table not in existing:
+            continue
+        for column in columns:
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET {column} = strftime('%Y-%m-%d %H:%M:%f000', {column}) "
+                    f"WHERE length({column}) = 19"
+                )
+            )
+
+
+MIGRATIONS = [
+    (1, "baseline", _baseline),
+    (2, "kyc_records_indexes", _kyc_records_indexes),
+    (3, "kyc_records_user_fk", _kyc_records_user_fk),
+    (4, "email_outbox", _email_outbox),
+    (5, "sqlite_timestamp_format", _sqlite_timestamp_format),
+]
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    _migration_metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        return {row.version for row in conn.execute(select(schema_migrations.c.version))}
+
+
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_KEY = 7_140_013
+
+
+@contextmanager
+def migration_lock(conn: Connection):
+    """Serialise ``upgrade`` across processes, e.g. several app workers starting at once.
+
+    PostgreSQL uses a session advisory lock; a SQLite file database uses an
+    exclusive lock on a ``.migrate.lock`` file beside it.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+        return
+
+    database = conn.engine.url.database
+    if conn.dialect.name != "sqlite" or fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def upgrade(engine: Engine, log=print) -> list[int]:
+    applied = []
+    with engine.connect() as conn, migration_lock(conn):
+        # Read under the lock: another worker may have just applied some.
+        done = applied_versions(engine)
+        for version, name, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                migrate(conn)
+                conn.execute(
+                    insert(schema_migrations).values(
+                        version=version, name=name, applied_at=datetime.now(timezone.utc)
+                    )
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            log(f"Applied migration {version:03d} {name}")
+            applied.append(version)
+    return applied
+
+
+# Tables small enough that a full scan is the intended plan.
+SMALL_TABLES = {"kyc_status_summary"}
+
+
+def hot_queries(user_id: int = 1) -> dict:
+    """The user and admin queries served on every request, by name."""
+    kyc = models.KYC
+    user = models.User
+    by_user = select(kyc).where(kyc.user_id == user_id).order_by(kyc.submission_date.desc())
+    since = datetime(2025, 1, 1)
+    until = datetime(2025, 2, 1)
+    return {
+        "login": select(user.id, user.hashed_password, user.is_admin).where(user.email == "user1@example.com"),
+        "require_admin": select(user.is_admin).where(user.id == user_id),
+        "kyc_status": by_user.limit(1),
+        "kyc_history": by_user,
+        "kyc_resubmit": select(kyc)
+        .where(kyc.user_id == user_id, kyc.status == "REJECTED")
+        .order_by(kyc.submission_date.desc()),
+        "admin_all_kyc": admin_page_query([], None, 50),
+        "admin_all_kyc_next_page": admin_page_query([], encode_cursor(until, 1000), 50),
+        "admin_all_kyc_by_status": admin_page_query(kyc_filters(status="REVIEW"), None, 50),
+        "admin_all_kyc_by_district": admin_page_query(kyc_filters(district="Chennai"), None, 50),
+        "admin_all_kyc_by_risk_band": admin_page_query(kyc_filters(risk_band="high"), None, 50),
+        "admin_all_kyc_by_date": admin_page_query(kyc_filters(date_from=since, date_to=until), None, 50),
+        "admin_counts_by_date": status_counts_query(kyc_filters(date_from=since, date_to=until)),
+        "admin_summary": admin_summary_query(),
+    }
+
+
+def plan_problems(conn: Connection, sql: str) -> list[str]:
+    """Full scans of tables outside SMALL_TABLES and sorts in the plan of ``sql``.
+
+    Index scans (SQLite ``SCAN ... USING INDEX``) are allowed: paged queries
+    read an index in order and stop at the LIMIT.
+    """
+    if conn.dialect.name == "sqlite":
+        problems = []
+        for detail in (row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))):
+            words = detail.split()
+            if "TEMP B-TREE" in detail:
+                problems.append(detail)
+            elif words[0] == "SCAN" and words[1] not in SMALL_TABLES and "USING" not in detail:
+                problems.append(detail)
+        return problems
+
+    if conn.dialect.name == "postgresql":
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        problems = []
+        stack = [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") not in SMALL_TABLES:
+                problems.append(f"Seq Scan on {node.get('Relation Name')}")
+            elif node.get("Node Type") == "Sort":
+                problems.append(f"Sort on {', '.join(node.get('Sort Key', []))}")
+            stack.extend(node.get("Plans", []))
+        return problems
+
+    raise ValueError(f"Plan checks are not implemented for {conn.dialect.name}")
+
+
+def seed_plan_database(engine: Engine, rows: int, users: int) -> None:
+    rng = random.Random(13)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User.__table__),
+            [
+                {"id": i, "email": f"user{i}@example.com", "hashed_password": "x", "is_admin": False}
+                for i in range(1, users + 1)
+            ],
+        )
+        batch = []
+        for i in range(rows):
+            batch.append(
+                {
+                    "user_id": rng.randint(1, users),
+                    "name": "Seed Applicant",
+                    "aadhaar_number": f"{rng.randrange(10**12):012d}",
+                    "district": rng.choice(["Chennai", "Tirupati", "Mumbai Suburban", "Delhi"]),
+                    "age": rng.randint(18, 80),
+                    "risk_score": rng.randint(0, 150),
+                    "status": rng.choice(["APPROVED", "REVIEW", "REJECTED"]),
+                    "submission_date": now - timedelta(minutes=i),
+                    "attempt_number": 1,
+                    "ocr_aadhaar_found": False,
+                    "ocr_name_found": False,
+                    "face_detected": False,
+                }
+            )
+            if len(batch) == 5000:
+                conn.execute(insert(models.KYC.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(models.KYC.__table__), batch)
+        conn.execute(text("ANALYZE"))
+    # Pooled SQLite connections keep the statistics they loaded before ANALYZE.
+    engine.dispose()
+
+
+def check_plans(database_url: str | None = None, rows: int = 50_000, users: int = 5_000) -> int:
+    tmp_dir = None
+    if database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'plan_check.db')}"
+
+    engine = create_engine(database_url)
+    try:
+        upgrade(engine, log=lambda message: None)
+        seed_plan_database(engine, rows=rows, users=users)
+
+        failures = 0
+        with engine.connect() as conn:
+            for name, stmt in hot_queries().items():
+                sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                problems = plan_problems(conn, sql)
+                if problems:
+                    failures += 1
+                    print(f"FAIL {name}: {'; '.join(problems)}")
+                else:
+                    print(f"ok   {name}")
+        return 1 if failures else 0
+    finally:
+        engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("upgrade", help="apply pending migrations to DATABASE_URL")
+    sub.add_parser("status", help="list migrations and whether they are applied")
+    plans = sub.add_parser("check-plans", help="fail if hot queries scan tables or sort")
+    plans.add_argument("--database-url", help="scratch database to seed (default: temporary SQLite)")
+    plans.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if args.command == "check-plans":
+        sys.exit(check_plans(args.database_url, rows=args.rows))
+
+    from .database import engine
+
+    if args.command == "upgrade":
+        if not upgrade(engine):
+            print("Database is up to date")
+    else:
+        done = applied_versions(engine)
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:03d} {name:<24} {'applied' if version in done else 'pending'}")
+
+
+if __name__ == "__main__":
+    main()
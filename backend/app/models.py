@@ -1,8 +1,37 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 from .database import Base
 
 
+class utc_now(FunctionElement):
+    """The current time, stored in one text format on SQLite.
+
+    SQLite keeps DATETIME as text and compares it as text. ``CURRENT_TIMESTAMP``
+    writes ``YYYY-MM-DD HH:MM:SS`` while bound Python datetimes are written as
+    ``YYYY-MM-DD HH:MM:SS.ffffff``, so the same instant would compare unequal
+    and keyset cursors would skip or repeat rows. On SQLite this default
+    writes the bound format; other backends use ``now()``. Columns use it as
+    the client-side default as well, so SQLite files whose DDL predates it
+    still get the same format.
+    """
+
+    type = DateTime(timezone=True)
+    name = "utc_now"
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _compile_utc_now(element, compiler, **kw):
+    return compiler.process(func.now(), **kw)
+
+
+@compiles(utc_now, "sqlite")
+def _compile_utc_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -14,18 +43,61 @@ class User(Base):
 
 class KYC(Base):
     __tablename__ = "kyc_records"
+    __table_args__ = (
+        Index("ix_kyc_records_user_id_submission_date", "user_id", "submission_date"),
+        Index("ix_kyc_records_status_submission_date", "status", "submission_date"),
+        Index("ix_kyc_records_submission_date_id", "submission_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", name="fk_kyc_records_user_id"), nullable=False)
     name = Column(String, nullable=False)
     aadhaar_number = Column(String, nullable=False)
     district = Column(String, nullable=False)
     age = Column(Integer, nullable=False)
     risk_score = Column(Integer)
     status = Column(String)
-    submission_date = Column(DateTime(timezone=True), server_default=func.now())
+    submission_date = Column(DateTime(timezone=True), default=utc_now(), server_default=utc_now())
     attempt_number = Column(Integer, default=1, nullable=False)
     ocr_aadhaar_found = Column(Boolean, default=False, nullable=False)
     ocr_name_found = Column(Boolean, default=False, nullable=False)
     ocr_flags = Column(String)
-    face_detected = Column(Boolean, default=False, nullable=False)
\ No newline at end of file
+    face_detected = Column(Boolean, default=False, nullable=False)
+
+
+class RescoreCheckpoint(Base):
+    __tablename__ = "rescore_checkpoints"
+
+    job_name = Column(String, primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
+    rows_scanned = Column(Integer, default=0, nullable=False)
+    rows_updated = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime(timezone=True), default=utc_now(), server_default=utc_now())
+    updated_at = Column(DateTime(timezone=True), default=utc_now(), server_default=utc_now(), onupdate=utc_now())
+    finished_at = Column(DateTime(timezone=True))
+
+
+class KYCStatusSummary(Base):
+    __tablename__ = "kyc_status_summary"
+
+    status = Column(String, primary_key=True)
+    risk_bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, default="PENDING", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), default=utc_now(), server_default=utc_now(), nullable=False)
+    last_error = Column(String)
+    created_at = Column(DateTime(timezone=True), default=utc_now(), server_default=utc_now())
+    sent_at = Column(DateTime(timezone=True))
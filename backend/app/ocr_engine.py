@@ -0,0 +1,241 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # optional: without it only the pytesseract subprocess path is available
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+OCR_ENGINE = os.getenv("KYC_OCR_ENGINE", "subprocess")  # "subprocess" or "pool" (needs tesserocr)
+OCR_POOL_SIZE = int(os.getenv("KYC_OCR_POOL_SIZE", str(os.cpu_count() or 1)))
+OCR_TIMEOUT_SECONDS = float(os.getenv("KYC_OCR_TIMEOUT", "30"))
+OCR_LANG = os.getenv("KYC_OCR_LANG", "eng")
+
+
+class OcrError(Exception):
+    pass
+
+
+class OcrTimeoutError(OcrError):
+    pass
+
+
+def _to_pil(image) -> Image.Image:
+    if isinstance(image, Image.Image):
+        return image
+    return Image.fromarray(np.asarray(image))
+
+
+class SubprocessOcrEngine:
+    """Current behaviour: pytesseract starts one ``tesseract`` process per call."""
+
+    def __init__(self, lang: str = OCR_LANG, timeout: float = OCR_TIMEOUT_SECONDS):
+        self.lang = lang
+        self.timeout = timeout
+
+    def image_to_string(self, image, psm: int | None = None, whitelist: str | None = None) -> str:
+        config = []
+        if psm is not None:
+            config.append(f"--psm {psm}")
+        if whitelist:
+            config.append(f"-c tessedit_char_whitelist={whitelist}")
+        try:
+            return pytesseract.image_to_string(
+                image, lang=self.lang, config=" ".join(config), timeout=self.timeout
+            )
+        except RuntimeError as exc:  # pytesseract reports its timeout as RuntimeError
+            raise OcrTimeoutError(str(exc)) from exc
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine:
+    """In-process Tesseract API that keeps the language model loaded between calls."""
+
+    def __init__(self, lang: str = OCR_LANG):
+        if tesserocr is None:
+            raise OcrError("tesserocr is not installed")
+        self.lang = lang
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        self._lock = threading.Lock()
+
+    def image_to_string(self, image, psm: int | None = None, whitelist: str | None = None) -> str:
+        api = self._api
+        with self._lock:
+            api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            api.SetImage(_to_pil(image))
+            try:
+                return api.GetUTF8Text()
+            finally:
+                api.Clear()
+
+    def close(self) -> None:
+        self._api.End()
+
+
+def in_process_ocr() -> bool:
+    """True when the configured engine keeps Tesseract loaded instead of spawning it per call.
+
+    Verification job workers pin an in-process engine whenever the pool is
+    configured, so the answer is the same in every process.
+    """
+    return OCR_ENGINE == "pool" and tesserocr is not None
+
+
+def local_engine() -> "SubprocessOcrEngine | TesserocrEngine":
+    if tesserocr is not None:
+        return TesserocrEngine()
+    return SubprocessOcrEngine()
+
+
+def _worker_main(conn, lang: str) -> None:
+    engine = TesserocrEngine(lang)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        image, psm, whitelist = job
+        try:
+            conn.send(("ok", engine.image_to_string(image, psm=psm, whitelist=whitelist)))
+        except Exception as exc:
+            conn.send(("error", repr(exc)))
+    engine.close()
+
+
+class _OcrWorker:
+    def __init__(self, ctx, lang: str):
+        self._ctx = ctx
+        self._lang = lang
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        self.process = self._ctx.Process(
+            target=_worker_main, args=(child_conn, self._lang), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+    def restart(self) -> None:
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.start()
+
+
+class PooledOcrEngine:
+    """Fixed pool of long-lived OCR worker processes.
+
+    Each worker loads the Tesseract engine once through tesserocr and then
+    serves jobs over a pipe; without tesserocr a worker would still start a
+    ``tesseract`` process per call, so the pool refuses to start. A job that exceeds
+    ``timeout`` gets its worker killed and replaced; a worker that dies is
+    replaced before its next job.
+    """
+
+    def __init__(self, size: int = OCR_POOL_SIZE, timeout: float = OCR_TIMEOUT_SECONDS, lang: str = OCR_LANG):
+        if tesserocr is None:
+            raise OcrError("PooledOcrEngine requires tesserocr")
+        self.timeout = timeout
+        ctx = multiprocessing.get_context("spawn")
+        self._workers = [_OcrWorker(ctx, lang) for _ in range(max(1, size))]
+        self._idle: queue.Queue = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def image_to_string(self, image, psm: int | None = None, whitelist: str | None = None) -> str:
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise OcrTimeoutError("No OCR worker became available")
+
+        try:
+            if not worker.process.is_alive():
+                worker.restart()
+            worker.conn.send((np.asarray(image), psm, whitelist))
+            if not worker.conn.poll(self.timeout):
+                worker.restart()
+                raise OcrTimeoutError(f"OCR job exceeded {self.timeout}s")
+            status, payload = worker.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError) as exc:
+            worker.restart()
+            raise OcrError("OCR worker crashed") from exc
+        finally:
+            self._idle.put(worker)
+
+        if status != "ok":
+            raise OcrError(payload)
+        return payload
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if OCR_ENGINE == "pool" and tesserocr is None:
+                    logger.warning(
+                        "KYC_OCR_ENGINE=pool needs tesserocr, which is not installed; using the subprocess engine"
+                    )
+                    _engine = SubprocessOcrEngine()
+                elif OCR_ENGINE == "pool":
+                    _engine = PooledOcrEngine()
+                else:
+                    _engine = SubprocessOcrEngine()
+    return _engine
+
+
+def use_local_engine() -> None:
+    """Pin this process to an in-process engine.
+
+    Used by processes that are already pool workers themselves (the
+    verification job queue), so they don't spawn a nested OCR pool.
+    """
+    global _engine
+    with _engine_lock:
+        _engine = local_engine()
+
+
+def close_ocr_engine() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
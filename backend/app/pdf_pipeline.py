@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+from .image_pipeline import DecodedImage
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional: PDFs are left for manual review without it
+    pdfium = None
+
+PDF_SUPPORTED = pdfium is not None
+PDF_DPI = int(os.getenv("KYC_PDF_DPI", "150"))
+PDF_MAX_PAGES = int(os.getenv("KYC_PDF_MAX_PAGES", "10"))
+PDF_MAX_PIXELS = int(os.getenv("KYC_PDF_MAX_PIXELS", str(40_000_000)))
+PDF_OCR_WORKERS = int(os.getenv("KYC_PDF_OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# pdfium is not thread-safe; every call into it goes through this lock.
+_pdfium_lock = threading.Lock()
+
+
+def analyse_pdf(
+    path: str,
+    analyse_page: Callable[[DecodedImage], dict],
+    dpi: int = PDF_DPI,
+    max_pages: int = PDF_MAX_PAGES,
+    max_pixels: int = PDF_MAX_PIXELS,
+    workers: int = PDF_OCR_WORKERS,
+) -> dict:
+    """Rasterise a PDF page by page and analyse pages in parallel.
+
+    Pages are rendered lazily, at most ``workers`` ahead of the analysis, so
+    rendering stops as soon as one page yielded an Aadhaar number and one a
+    face. ``max_pages`` and ``max_pixels`` (summed over rendered pages) bound
+    the work a single document can cause; pages past either budget are
+    skipped and reported in ``flags``.
+    """
+    flags: list[str] = []
+    timings_ms: dict[str, float] = {}
+    pages: dict[int, dict] = {}
+    scale = dpi / 72
+
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(path)
+        page_count = len(document)
+
+    def render(index: int) -> DecodedImage:
+        start = time.perf_counter()
+        with _pdfium_lock:
+            page = document[index]
+            try:
+                bitmap = page.render(scale=scale, grayscale=True)
+                try:
+                    pixels = bitmap.to_numpy()
+                    if pixels.ndim == 3:
+                        pixels = pixels[:, :, 0]
+                    # to_numpy() is a view of PDFium's buffer, which is freed
+                    # with the bitmap; copy it out before closing.
+                    gray = pixels.copy()
+                finally:
+                    bitmap.close()
+            finally:
+                page.close()
+        decoded = DecodedImage.from_gray(gray)
+        decoded.timings_ms["rasterise"] = round((time.perf_counter() - start) * 1000, 2)
+        return decoded
+
+    def run_page(index: int) -> tuple[int, dict, dict]:
+        decoded = render(index)
+        return index, analyse_page(decoded), decoded.timings_ms
+
+    try:
+        if page_count > max_pages:
+            flags.append(f"PDF has {page_count} pages; only the first {max_pages} were checked")
+
+        aadhaar_found = False
+        face_detected = False
+        pixels = 0
+        next_page = 0
+        last_page = min(page_count, max_pages)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            pending = set()
+            while True:
+                while (
+                    next_page < last_page
+                    and len(pending) < max(1, workers)
+                    and not (aadhaar_found and face_detected)
+                ):
+                    with _pdfium_lock:
+                        width, height = document.get_page_size(next_page)
+                    page_pixels = int(width * scale) * int(height * scale)
+                    if pixels + page_pixels > max_pixels:
+                        flags.append(f"PDF pixel budget reached; stopped before page {next_page + 1}")
+                        last_page = next_page
+                        break
+                    pixels += page_pixels
+                    pending.add(executor.submit(run_page, next_page))
+                    next_page += 1
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, page_result, page_timings = future.result()
+                    pages[index] = page_result
+                    aadhaar_found = aadhaar_found or page_result["aadhaar_found"]
+                    face_detected = face_detected or page_result["face_detected"]
+                    for stage, elapsed in page_timings.items():
+                        timings_ms[stage] = round(timings_ms.get(stage, 0.0) + elapsed, 2)
+
+                if aadhaar_found and face_detected:
+                    for future in pending:
+                        future.cancel()
+                    break
+    finally:
+        with _pdfium_lock:
+            document.close()
+
+    ordered = [pages[index] for index in sorted(pages)]
+    return {
+        "ocr_text": "\f".join(page["ocr_text"] for page in ordered),
+        "aadhaar_found": aadhaar_found,
+        "ocr_failed": bool(ordered) and all(page["ocr_failed"] for page in ordered),
+        "face_detected": face_detected,
+        "ocr_paths": [page["ocr_path"] for page in ordered],
+        "pages_checked": len(ordered),
+        "page_count": page_count,
+        "flags": flags,
+        "timings_ms": timings_ms,
+    }
@@ -0,0 +1,193 @@
+"""Token-bucket rate limiting for the unauthenticated auth endpoints.
+
+Buckets hold up to ``burst`` tokens and refill at ``per_minute / 60``
+tokens a second; a request takes one token or is rejected with the number
+of seconds until one is available. State lives in process memory by
+default. Set ``RATE_LIMIT_STORE=redis`` (and ``REDIS_URL``) to share
+buckets between workers through Redis or any server speaking its
+protocol.
+
+Clients are keyed by the connecting address. Behind a reverse proxy every
+request would share the proxy's bucket, so list the proxies in
+``AUTH_RATE_TRUSTED_PROXIES`` (addresses or CIDR ranges, comma separated);
+for requests from them the client is taken from ``X-Forwarded-For``.
+"""
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import anyio
+
+try:
+    import redis
+except ImportError:  # optional: only needed for RATE_LIMIT_STORE=redis
+    redis = None
+
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in os.getenv("AUTH_RATE_TRUSTED_PROXIES", "").split(",")
+    if entry.strip()
+]
+
+
+def _is_trusted_proxy(address: str, trusted: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_address(peer: str | None, forwarded_for: str | None, trusted: list = TRUSTED_PROXIES) -> str | None:
+    """The client to rate limit: ``peer``, or for a trusted proxy the
+    right-most ``X-Forwarded-For`` hop that is not itself a trusted proxy.
+
+    Hops left of the first untrusted one are client-supplied and ignored.
+    """
+    if not peer or not forwarded_for or not _is_trusted_proxy(peer, trusted):
+        return peer
+    for hop in reversed([hop.strip() for hop in forwarded_for.split(",") if hop.strip()]):
+        if not _is_trusted_proxy(hop, trusted):
+            return hop
+    return peer
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    burst: int
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60
+
+
+AUTH_IP_POLICY = BucketPolicy(
+    burst=int(os.getenv("AUTH_RATE_IP_BURST", "20")),
+    per_minute=float(os.getenv("AUTH_RATE_IP_PER_MINUTE", "30")),
+)
+AUTH_EMAIL_POLICY = BucketPolicy(
+    burst=int(os.getenv("AUTH_RATE_EMAIL_BURST", "5")),
+    per_minute=float(os.getenv("AUTH_RATE_EMAIL_PER_MINUTE", "10")),
+)
+
+
+class MemoryBucketStore:
+    """Buckets in a bounded LRU; the least recently used key is dropped first."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, policy: BucketPolicy) -> float:
+        """Take one token; returns 0 on success, else seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(policy.burst), now))
+            tokens = min(policy.burst, tokens + (now - updated) * policy.refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / policy.refill_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+# Refill and take in one round trip so concurrent workers can't both spend
+# the last token.
+_TAKE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore:
+    # Each take is a network round trip; async callers run it in a thread.
+    blocking = True
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "ratelimit:"):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires the redis package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, policy: BucketPolicy) -> float:
+        result = self._take(
+            keys=[self.prefix + key],
+            args=[policy.burst, policy.refill_per_second, time.time()],
+        )
+        return float(result)
+
+
+def make_store(kind: str = RATE_LIMIT_STORE):
+    if kind == "memory":
+        return MemoryBucketStore()
+    if kind == "redis":
+        return RedisBucketStore()
+    raise ValueError(f"Unknown RATE_LIMIT_STORE {kind!r}")
+
+
+class AuthRateLimiter:
+    def __init__(
+        self,
+        store=None,
+        ip_policy: BucketPolicy = AUTH_IP_POLICY,
+        email_policy: BucketPolicy = AUTH_EMAIL_POLICY,
+    ):
+        self.store = store if store is not None else make_store()
+        self.ip_policy = ip_policy
+        self.email_policy = email_policy
+
+    def check(self, action: str, ip: str | None, email: str | None) -> tuple[str, int] | None:
+        """Spend a token from the IP bucket and then the email bucket.
+
+        Returns ``None`` if the request may proceed, otherwise which bucket
+        rejected it (``"ip"`` or ``"email"``) and a Retry-After in seconds.
+        """
+        if ip:
+            wait = self.store.take(f"{action}:ip:{ip}", self.ip_policy)
+            if wait > 0:
+                return "ip", math.ceil(wait)
+        if email:
+            wait = self.store.take(f"{action}:email:{email.strip().lower()}", self.email_policy)
+            if wait > 0:
+                return "email", math.ceil(wait)
+        return None
+
+    async def check_async(self, action: str, ip: str | None, email: str | None) -> tuple[str, int] | None:
+        """``check`` for async endpoints; keeps Redis round trips off the event loop."""
+        if getattr(self.store, "blocking", True):
+            return await anyio.to_thread.run_sync(self.check, action, ip, email)
+        return self.check(action, ip, email)
+
+
+auth_rate_limiter = AuthRateLimiter()
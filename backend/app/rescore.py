@@ -0,0 +1,222 @@
+"""Recompute risk_score and status for existing kyc_records.
+
+Walks ``kyc_records`` in primary-key order with keyset pagination, scores
+each chunk with the vectorised scorer and writes changed rows back. Each
+UPDATE only matches a row whose status and risk_score are still the ones
+the chunk read, so a concurrent submit or resubmit is never overwritten
+(and its summary change is not applied twice); such rows are skipped, as
+the concurrent write already scored them with the current rules. Changed
+rows are written by set-based UPDATE ... FROM (VALUES ...) RETURNING id,
+and the summary adjustments are computed from the returned ids. The
+chunk's updates, the matching status-summary adjustments and the job
+checkpoint commit in the same transaction, so a crashed run resumes after
+the last committed chunk.
+
+    python -m app.rescore --job district-refresh --chunk-size 20000
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import pandas as pd
+from sqlalchemy import Integer, String, cast, column, update, values
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .scoring import score_frame
+from .summary import apply_deltas, risk_bucket
+
+RESCORE_CHUNK_ROWS = 10_000
+
+# Rows per compare-and-set UPDATE; keeps the bound parameters (five per row)
+# under SQLite's and PostgreSQL's limits.
+UPDATE_BATCH_ROWS = 1_000
+
+_kyc = models.KYC.__table__
+
+
+def _update_if_unchanged(db: Session, rows: list[dict]) -> set[int]:
+    """Write new scores for the rows still holding their old ones; returns the updated ids.
+
+    One ``WITH changes AS (VALUES ...) UPDATE kyc_records ... FROM changes
+    RETURNING id`` per batch.
+    """
+    changes = values(
+        column("row_id", Integer),
+        column("old_status", String),
+        column("old_risk_score", Integer),
+        column("new_risk_score", Integer),
+        column("new_status", String),
+        name="changes",
+    ).data([
+        (row["row_id"], row["old_status"], row["old_risk_score"], row["new_risk_score"], row["new_status"])
+        for row in rows
+    ]).cte("changes")
+    stmt = (
+        update(_kyc)
+        .where(
+            _kyc.c.id == changes.c.row_id,
+            _kyc.c.status.is_not_distinct_from(changes.c.old_status),
+            # A column of NULLs would otherwise be typed as text on PostgreSQL.
+            _kyc.c.risk_score.is_not_distinct_from(cast(changes.c.old_risk_score, Integer)),
+        )
+        .values(risk_score=changes.c.new_risk_score, status=changes.c.new_status)
+        .returning(_kyc.c.id)
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def get_checkpoint(db: Session, job_name: str) -> models.RescoreCheckpoint | None:
+    return db.get(models.RescoreCheckpoint, job_name)
+
+
+def run_rescore(
+    db: Session,
+    job_name: str = "default",
+    chunk_size: int = RESCORE_CHUNK_ROWS,
+    restart: bool = False,
+    log=print,
+) -> dict:
+    checkpoint = get_checkpoint(db, job_name)
+    if checkpoint is None or restart:
+        if checkpoint is not None:
+            db.delete(checkpoint)
+            db.flush()
+        checkpoint = models.RescoreCheckpoint(job_name=job_name, last_id=0, rows_scanned=0, rows_updated=0)
+        db.add(checkpoint)
+        db.commit()
+    elif checkpoint.finished_at is not None:
+        log(f"Rescore job '{job_name}' already finished; pass restart to run it again")
+        return _summary(checkpoint, 0, 0.0)
+
+    scanned_this_run = 0
+    start = time.perf_counter()
+
+    while True:
+        rows = (
+            db.query(
+                models.KYC.id,
+                models.KYC.name,
+                models.KYC.aadhaar_number,
+                models.KYC.district,
+                models.KYC.age,
+                models.KYC.risk_score,
+                models.KYC.status,
+                models.KYC.submission_date,
+            )
+            .filter(models.KYC.id > checkpoint.last_id)
+            .order_by(models.KYC.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        chunk = pd.DataFrame(
+            rows,
+            columns=[
+                "id", "name", "aadhaar_number", "district", "age",
+                "old_risk_score", "old_status", "submission_date",
+            ],
+        )
+        scored = score_frame(chunk)
+        changed = scored[
+            (scored["risk_score"] != scored["old_risk_score"]) | (scored["status"] != scored["old_status"])
+        ]
+        updated = skipped = 0
+        if not changed.empty:
+            pending = [
+                {
+                    "row_id": int(row.id),
+                    "old_status": row.old_status,
+                    "old_risk_score": None if pd.isna(row.old_risk_score) else int(row.old_risk_score),
+                    "new_risk_score": int(row.risk_score),
+                    "new_status": row.status,
+                }
+                for row in changed.itertuples(index=False)
+            ]
+            written: set[int] = set()
+            for i in range(0, len(pending), UPDATE_BATCH_ROWS):
+                written |= _update_if_unchanged(db, pending[i:i + UPDATE_BATCH_ROWS])
+            deltas: Counter = Counter()
+            for row in pending:
+                if row["row_id"] not in written:
+                    skipped += 1  # changed since the chunk was read
+                    continue
+                updated += 1
+                deltas[(row["old_status"], risk_bucket(row["old_risk_score"]))] -= 1
+                deltas[(row["new_status"], risk_bucket(row["new_risk_score"]))] += 1
+            apply_deltas(db, deltas)
+
+        checkpoint.last_id = int(chunk["id"].iloc[-1])
+        checkpoint.rows_scanned += len(chunk)
+        checkpoint.rows_updated += updated
+        db.commit()
+
+        scanned_this_run += len(chunk)
+        elapsed = time.perf_counter() - start
+        log(
+            f"rescore[{job_name}] up to id {checkpoint.last_id}: "
+            f"{checkpoint.rows_scanned} scanned, {checkpoint.rows_updated} updated, "
+            f"{scanned_this_run / elapsed:.0f} rows/sec"
+            + (f", {skipped} skipped (changed concurrently)" if skipped else "")
+        )
+
+    checkpoint.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    return _summary(checkpoint, scanned_this_run, time.perf_counter() - start)
+
+
+def _summary(checkpoint: models.RescoreCheckpoint, scanned_this_run: int, elapsed: float) -> dict:
+    return {
+        "job_name": checkpoint.job_name,
+        "last_id": checkpoint.last_id,
+        "rows_scanned": checkpoint.rows_scanned,
+        "rows_updated": checkpoint.rows_updated,
+        "finished": checkpoint.finished_at is not None,
+        "rows_per_sec": round(scanned_this_run / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+_running_jobs: set[str] = set()
+_running_lock = threading.Lock()
+
+
+def claim_job(job_name: str) -> bool:
+    """Mark ``job_name`` as running in this process; False if it already is."""
+    with _running_lock:
+        if job_name in _running_jobs:
+            return False
+        _running_jobs.add(job_name)
+        return True
+
+
+def run_rescore_job(job_name: str, chunk_size: int = RESCORE_CHUNK_ROWS, restart: bool = False) -> dict:
+    """Run a rescore job in its own session; the caller must have claimed it."""
+    db = SessionLocal()
+    try:
+        return run_rescore(db, job_name=job_name, chunk_size=chunk_size, restart=restart)
+    finally:
+        db.close()
+        with _running_lock:
+            _running_jobs.discard(job_name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job", default="default", help="checkpoint name; reuse it to resume")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_ROWS)
+    parser.add_argument("--restart", action="store_true", help="discard the checkpoint and start over")
+    args = parser.parse_args()
+
+    if not claim_job(args.job):
+        raise SystemExit(f"Rescore job '{args.job}' is already running")
+    summary = run_rescore_job(args.job, chunk_size=args.chunk_size, restart=args.restart)
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
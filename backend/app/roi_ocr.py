@@ -0,0 +1,108 @@
+import os
+import re
+
+import cv2
+import numpy as np
+
+ROI_MAX_LINES = int(os.getenv("KYC_ROI_MAX_LINES", "8"))
+ROI_PADDING = 4
+
+DIGITS = "0123456789"
+
+# 12 digits, either run together or printed in groups of four as on the card
+# ("1234 5678 9012"). Shared by the ROI and full-page paths so both accept
+# the same text.
+AADHAAR_NUMBER = re.compile(r"(?<!\d)(\d{4})[ \t-]?(\d{4})[ \t-]?(\d{4})(?!\d)")
+
+
+def find_aadhaar_number(text: str) -> str | None:
+    """The first Aadhaar number in OCR ``text`` as 12 digits, or None."""
+    match = AADHAAR_NUMBER.search(text)
+    return "".join(match.groups()) if match else None
+
+
+def find_text_lines(
+    gray: np.ndarray, face_box: tuple[int, int, int, int] | None = None
+) -> list[tuple[int, int, int, int]]:
+    """Locate likely printed text lines as ``(x, y, w, h)`` boxes.
+
+    Uses a morphological gradient, Otsu threshold and a wide horizontal
+    closing so the characters of one line merge into a single blob. With a
+    ``face_box`` the search is limited to the card area around the photo
+    (the details block beside it and the number strip below it) and lines
+    are ordered by distance to the photo.
+    """
+    height, width = gray.shape[:2]
+    gradient = cv2.morphologyEx(
+        gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    )
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    kernel_width = max(9, width // 40)
+    closed = cv2.morphologyEx(
+        binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_width, 1))
+    )
+    contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_height = max(8, height // 80)
+    max_height = max(min_height + 1, height // 8)
+    lines = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if not (min_height <= h <= max_height) or w < 2 * h:
+            continue
+        lines.append((x, y, w, h))
+
+    if face_box is None:
+        return sorted(lines, key=lambda box: (box[1], box[0]))
+
+    fx, fy, fw, fh = face_box
+    top = fy - fh // 2
+    bottom = fy + 3 * fh
+
+    def near_face(box):
+        x, y, w, h = box
+        return top <= y + h // 2 <= bottom and x + w > fx
+
+    def distance(box):
+        x, y, w, h = box
+        return abs((y + h / 2) - (fy + fh / 2)) + max(0, fx - x)
+
+    return sorted((box for box in lines if near_face(box)), key=distance)
+
+
+def _crop(gray: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    height, width = gray.shape[:2]
+    x, y, w, h = box
+    x0, y0 = max(0, x - ROI_PADDING), max(0, y - ROI_PADDING)
+    x1, y1 = min(width, x + w + ROI_PADDING), min(height, y + h + ROI_PADDING)
+    return gray[y0:y1, x0:x1]
+
+
+def extract_fields(engine, gray: np.ndarray, face_box=None, max_lines: int = ROI_MAX_LINES) -> dict | None:
+    """OCR only the text lines near the photo.
+
+    Lines shaped like the 12-digit number strip are read in single-line
+    digit-only mode. Returns ``None`` when no Aadhaar number was found, in
+    which case the caller should fall back to full-page OCR.
+    """
+    lines = find_text_lines(gray, face_box)[:max_lines]
+    if not lines:
+        return None
+
+    aadhaar_number = None
+    for box in lines:
+        _, _, w, h = box
+        if not 6 <= w / h <= 25:
+            continue
+        aadhaar_number = find_aadhaar_number(
+            engine.image_to_string(_crop(gray, box), psm=7, whitelist=DIGITS)
+        )
+        if aadhaar_number is not None:
+            break
+
+    if aadhaar_number is None:
+        return None
+
+    texts = [engine.image_to_string(_crop(gray, box), psm=7).strip() for box in lines]
+    texts.append(aadhaar_number)
+    return {"ocr_text": "\n".join(text for text in texts if text), "aadhaar_number": aadhaar_number}
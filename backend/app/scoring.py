@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import IO, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .uidai_risk import get_district_risk_score, month_key, risk_score_for_month
+
+DISTRICT_AADHAAR_PREFIX = {
+    "Chennai": "11",
+    "Mumbai": "22",
+    "Delhi": "33",
+}
+
+INVALID_AGE_REASON = "Invalid or missing age"
+
+REVIEW_THRESHOLD = 40
+REJECT_THRESHOLD = 70
+
+BATCH_CHUNK_ROWS = 100_000
+APPLICANT_COLUMNS = ["name", "aadhaar_number", "district", "age"]
+
+# Reasons are joined with this separator inside the vectorised scorer; it
+# does not occur in any reason text.
+_REASON_SEP = "|"
+
+
+def calculate_kyc_decision(
+    name: str, aadhaar_number: str, district: str, age: int, at: datetime | None = None
+) -> tuple[int, str, list[str], int]:
+    risk_score = 0
+    reasons: list[str] = []
+
+    if len(name.strip()) < 3:
+        risk_score += 40
+        reasons.append("Invalid name - too short")
+
+    if not name.replace(" ", "").isalpha():
+        risk_score += 40
+        reasons.append("Invalid name - contains numbers or symbols")
+
+    if len(aadhaar_number) != 12 or not aadhaar_number.isdigit():
+        risk_score += 40
+        reasons.append("Invalid Aadhaar format")
+
+    if age < 18:
+        risk_score += 30
+        reasons.append("Applicant is underage")
+
+    expected_prefix = DISTRICT_AADHAAR_PREFIX.get(district)
+    if expected_prefix and not aadhaar_number.startswith(expected_prefix):
+        risk_score += 30
+        reasons.append("District-Aadhaar mismatch")
+
+    uidai_score = get_district_risk_score(district, at)
+    if uidai_score == 25:
+        risk_score += uidai_score
+        reasons.append("High risk district based on UIDAI enrollment data")
+    elif uidai_score == 15:
+        risk_score += uidai_score
+        reasons.append("District not in UIDAI dataset - unverified region")
+
+    if risk_score >= REJECT_THRESHOLD:
+        status = "REJECTED"
+    elif risk_score >= REVIEW_THRESHOLD:
+        status = "REVIEW"
+    else:
+        status = "APPROVED"
+
+    return risk_score, status, reasons, uidai_score
+
+
+def _district_scores(district: pd.Series, months: pd.Series | None) -> np.ndarray:
+    if months is None:
+        scores = {d: risk_score_for_month(d, None) for d in district.unique()}
+        return district.map(scores).to_numpy(dtype=np.int64)
+    # One lookup per distinct (district, month) pair, scattered back by code.
+    district_codes, district_names = pd.factorize(district)
+    month_codes, month_names = pd.factorize(months)
+    pair_codes, inverse = np.unique(
+        district_codes.astype(np.int64) * (len(month_names) + 1) + month_codes, return_inverse=True
+    )
+    scores = np.fromiter(
+        (
+            risk_score_for_month(
+                district_names[code // (len(month_names) + 1)],
+                month_names[code % (len(month_names) + 1)] or None,
+            )
+            for code in pair_codes
+        ),
+        dtype=np.int64,
+        count=len(pair_codes),
+    )
+    return scores[inverse]
+
+
+def score_frame(applicants: pd.DataFrame, at: datetime | None = None) -> pd.DataFrame:
+    """Vectorised ``calculate_kyc_decision`` over a frame of applicants.
+
+    Expects ``name``, ``aadhaar_number``, ``district`` and ``age`` columns and
+    returns a copy with ``risk_score``, ``status``, ``reasons`` (list per
+    row) and ``uidai_district_risk`` added. District risk is looked up for
+    each row's ``submission_date`` when that column exists, otherwise for
+    ``at``. Results are identical to calling the scalar function row by row.
+
+    A row whose ``age`` is blank or not a number is not scored: it gets
+    status ``ERROR``, risk score 0 and the reason ``INVALID_AGE_REASON``,
+    so one bad row does not abort a batch.
+    """
+    name = applicants["name"].astype(str)
+    aadhaar = applicants["aadhaar_number"].astype(str)
+    district = applicants["district"].astype(str)
+    age = pd.to_numeric(applicants["age"], errors="coerce").to_numpy(dtype=np.float64)
+    invalid_age = np.isnan(age)
+
+    months = None
+    if "submission_date" in applicants.columns:
+        submitted = pd.to_datetime(applicants["submission_date"], errors="coerce", utc=True)
+        # Factorise on integer YYYYMM so each distinct month is formatted once.
+        yyyymm = (submitted.dt.year * 100 + submitted.dt.month).fillna(0).astype(np.int64)
+        codes, uniques = pd.factorize(yyyymm)
+        labels = np.array([f"{m // 100:04d}-{m % 100:02d}" if m else "" for m in uniques], dtype=object)
+        months = pd.Series(labels[codes], index=applicants.index)
+    elif at is not None:
+        months = pd.Series(month_key(at), index=applicants.index)
+    uidai_score = _district_scores(district, months)
+
+    mismatch = np.zeros(len(applicants), dtype=bool)
+    for district_name, prefix in DISTRICT_AADHAAR_PREFIX.items():
+        in_district = (district == district_name).to_numpy()
+        if in_district.any():
+            mismatch |= in_district & ~aadhaar.str.startswith(prefix).to_numpy()
+
+    rules = [
+        (name.str.strip().str.len().to_numpy() < 3, 40, "Invalid name - too short"),
+        (~name.str.replace(" ", "", regex=False).str.isalpha().to_numpy(dtype=bool), 40,
+         "Invalid name - contains numbers or symbols"),
+        ((aadhaar.str.len() != 12).to_numpy() | ~aadhaar.str.isdigit().to_numpy(dtype=bool), 40,
+         "Invalid Aadhaar format"),
+        (age < 18, 30, "Applicant is underage"),
+        (mismatch, 30, "District-Aadhaar mismatch"),
+        (uidai_score == 25, 25, "High risk district based on UIDAI enrollment data"),
+        (uidai_score == 15, 15, "District not in UIDAI dataset - unverified region"),
+    ]
+
+    risk_score = np.zeros(len(applicants), dtype=np.int64)
+    joined = np.full(len(applicants), "", dtype=object)
+    for mask, points, reason in rules:
+        risk_score += np.where(mask, points, 0)
+        joined = joined + np.where(mask, reason + _REASON_SEP, "").astype(object)
+
+    status = np.select(
+        [risk_score >= REJECT_THRESHOLD, risk_score >= REVIEW_THRESHOLD],
+        ["REJECTED", "REVIEW"],
+        default="APPROVED",
+    )
+    if invalid_age.any():
+        risk_score[invalid_age] = 0
+        status = np.where(invalid_age, "ERROR", status)
+        joined[invalid_age] = INVALID_AGE_REASON + _REASON_SEP
+
+    scored = applicants.copy()
+    scored["risk_score"] = risk_score
+    scored["status"] = status
+    scored["reasons"] = [r.split(_REASON_SEP)[:-1] if r else [] for r in joined]
+    scored["uidai_district_risk"] = uidai_score
+    return scored
+
+
+def read_applicants(source: "str | IO", fmt: str, chunk_rows: int = BATCH_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield applicant frames of at most ``chunk_rows`` rows from CSV, JSON-lines or Parquet."""
+    string_columns = {"name": str, "aadhaar_number": str, "district": str}
+    if fmt == "csv":
+        yield from pd.read_csv(
+            source, dtype=string_columns, keep_default_na=False, chunksize=chunk_rows
+        )
+    elif fmt == "jsonl":
+        for chunk in pd.read_json(source, lines=True, dtype=string_columns, chunksize=chunk_rows):
+            yield chunk
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas().astype(string_columns)
+    else:
+        raise ValueError(f"Unsupported applicant file format: {fmt}")
+
+
+def score_applicants(
+    source: "str | IO", fmt: str, output: str = "jsonl", at: datetime | None = None
+) -> Iterator[str]:
+    """Score an applicant file chunk by chunk and yield serialised decisions.
+
+    Rows are scored for their own ``submission_date`` when the file has
+    one, otherwise for the load period containing ``at``.
+    """
+    header = True
+    for chunk in read_applicants(source, fmt):
+        missing = [c for c in APPLICANT_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing applicant columns: {', '.join(missing)}")
+        scored = score_frame(chunk, at=at)
+        if output == "csv":
+            scored["reasons"] = scored["reasons"].str.join("; ")
+            yield scored.to_csv(index=False, header=header)
+            header = False
+        else:
+            lines = scored.to_json(orient="records", lines=True, force_ascii=False)
+            yield lines if lines.endswith("\n") else lines + "\n"
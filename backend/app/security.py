@@ -1,7 +1,12 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,7 +19,26 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cost factor for new hashes. Hashes made with a different cost are
+# rehashed on the user's next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a few threads give real parallelism; keeping
+# them separate from the request threadpool means a login burst queues here
+# instead of starving every other sync endpoint.
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 
 # 🔐 Hash password
@@ -27,10 +51,63 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify on the bcrypt executor; also returns a new hash when the
+    stored one was made with a different cost, else None."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 # 🔐 Create JWT token
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+
+class TokenCache:
+    """Bounded LRU of already-verified tokens, each valid until its ``exp``."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if exp is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (float(exp), payload)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+# 🔐 Decode JWT token
+def decode_access_token(token: str) -> dict:
+    """Return the token's claims, raising JWTError if it is invalid."""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.put(token, payload)
+    return payload
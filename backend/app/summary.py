@@ -0,0 +1,148 @@
+"""Status and risk-score rollups for the dashboards.
+
+``kyc_status_summary`` holds one row per (status, risk bucket) with the
+number of KYC records in it. Submit, resubmit and the rescore job adjust
+it in the same transaction as the records they write, so the admin
+headline numbers are read from a few dozen rows instead of scanning
+``kyc_records``. ``rebuild_summary`` recomputes it from scratch with a
+GROUP BY and is used to seed an empty table or repair drift.
+"""
+from collections import Counter
+
+from sqlalchemy import Integer, case, cast, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+
+RISK_BUCKET_WIDTH = 10
+NO_SCORE_BUCKET = -1
+
+
+def risk_bucket(risk_score: int | None) -> int:
+    if risk_score is None:
+        return NO_SCORE_BUCKET
+    return risk_score // RISK_BUCKET_WIDTH
+
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _bump(db: Session, status: str | None, bucket: int, delta: int) -> None:
+    """Add ``delta`` to one summary row, creating it if needed.
+
+    Concurrent submits may both be first into a (status, bucket), so the
+    row is created with a dialect upsert, or elsewhere by retrying the
+    UPDATE when the INSERT loses the race.
+    """
+    if delta == 0 or status is None:
+        return
+    summary = models.KYCStatusSummary
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(summary).values(status=status, risk_bucket=bucket, count=delta)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[summary.status, summary.risk_bucket],
+                set_={"count": summary.count + stmt.excluded.count},
+            )
+        )
+        return
+
+    increment = (
+        update(summary)
+        .where(summary.status == status, summary.risk_bucket == bucket)
+        .values(count=summary.count + delta)
+    )
+    if db.execute(increment).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(summary(status=status, risk_bucket=bucket, count=delta))
+    except IntegrityError:
+        db.execute(increment)
+
+
+def apply_deltas(db: Session, deltas: Counter) -> None:
+    """Apply ``{(status, bucket): delta}`` adjustments to the summary."""
+    for (status, bucket), delta in deltas.items():
+        _bump(db, status, bucket, delta)
+
+
+def record_change(
+    db: Session,
+    old: tuple[str | None, int | None] | None,
+    new: tuple[str | None, int | None],
+) -> None:
+    """Move one record from ``old`` (status, risk_score) to ``new``; ``old`` is None for inserts."""
+    deltas: Counter = Counter()
+    if old is not None:
+        deltas[(old[0], risk_bucket(old[1]))] -= 1
+    deltas[(new[0], risk_bucket(new[1]))] += 1
+    apply_deltas(db, deltas)
+
+
+def _bucket_expr():
+    # Scores are non-negative, so subtracting the remainder gives an exact
+    # multiple and the division is exact on every backend.
+    score = models.KYC.risk_score
+    return case(
+        (score.is_(None), NO_SCORE_BUCKET),
+        else_=cast((score - score % RISK_BUCKET_WIDTH) / RISK_BUCKET_WIDTH, Integer),
+    )
+
+
+def rebuild_summary(db: Session) -> None:
+    bucket = _bucket_expr()
+    rows = db.execute(
+        select(models.KYC.status, bucket, func.count())
+        .where(models.KYC.status.is_not(None))
+        .group_by(models.KYC.status, bucket)
+    ).all()
+    db.execute(delete(models.KYCStatusSummary))
+    db.add_all(
+        models.KYCStatusSummary(status=status, risk_bucket=int(b), count=count)
+        for status, b, count in rows
+    )
+    db.commit()
+
+
+def ensure_summary(db: Session) -> None:
+    """Seed the summary table if it is empty but KYC records exist."""
+    has_summary = db.execute(select(models.KYCStatusSummary.status).limit(1)).first()
+    if has_summary is None and db.execute(select(models.KYC.id).limit(1)).first() is not None:
+        rebuild_summary(db)
+
+
+def admin_summary_query():
+    return select(
+        models.KYCStatusSummary.status,
+        models.KYCStatusSummary.risk_bucket,
+        models.KYCStatusSummary.count,
+    )
+
+
+def build_admin_summary(rows) -> dict:
+    counts: Counter = Counter()
+    histogram: Counter = Counter()
+    for status, bucket, count in rows:
+        counts[status] += count
+        histogram[bucket] += count
+
+    return {
+        "total": sum(counts.values()),
+        "approved": counts.get("APPROVED", 0),
+        "review": counts.get("REVIEW", 0),
+        "rejected": counts.get("REJECTED", 0),
+        "risk_histogram": [
+            {
+                "bucket_start": b * RISK_BUCKET_WIDTH if b != NO_SCORE_BUCKET else None,
+                "bucket_end": (b + 1) * RISK_BUCKET_WIDTH if b != NO_SCORE_BUCKET else None,
+                "count": histogram[b],
+            }
+            for b in sorted(histogram)
+            if histogram[b]
+        ],
+    }
+
@@ -1,13 +1,43 @@
-import pandas as pd
+import glob
+import logging
 import os
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+
+# Outputs of the uidai-upload-analysis pipeline (steps 4, 8, 10 and 11)
+BASE = os.getenv(
+    "KYC_UIDAI_ANALYSIS_DIR",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "../../uidai-upload-analysis/analysis")),
+)
+RISK_RELOAD_SECONDS = float(os.getenv("KYC_RISK_RELOAD_SECONDS", "30"))
+
+logger = logging.getLogger(__name__)
 
-# Load your alert status CSV
-BASE = os.path.join(
-    os.path.dirname(__file__),
-    "../../uidai-upload-analysis/analysis"
+SOURCE_PATTERNS = (
+    "alert_status_*.csv",
+    "resource_priority_*.csv",
+    "heavy_upload_months_*.csv",
+    "forecast_*.csv",
 )
 
-# Build district risk map manually from your findings
+# Step 11 marks a district HIGH priority from this readiness index upwards.
+HIGH_READINESS = 0.75
+
+# Spellings applicants use for districts the analysis names differently.
+DISTRICT_ALIASES = {
+    "mumbai": "mumbai suburban",
+    "bombay": "mumbai suburban",
+    "madras": "chennai",
+    "tirupathi": "tirupati",
+    "bengaluru": "bangalore",
+    "calcutta": "kolkata",
+}
+
+# Fallback for districts the analysis does not cover yet; districts present
+# in the CSVs are scored from the data instead.
 DISTRICT_RISK = {
     "Chennai": {"flag": "NORMAL", "readiness": 0.72},
     "Tirupati": {"flag": "NORMAL", "readiness": 0.68},
@@ -20,10 +50,220 @@ DISTRICT_RISK = {
 
 }
 
-def get_district_risk_score(district: str) -> int:
-    info = DISTRICT_RISK.get(district)
-    if info is None:
+
+def normalise_district(district: str | None) -> str:
+    key = " ".join(str(district or "").split()).casefold()
+    return DISTRICT_ALIASES.get(key, key)
+
+
+def _state_code(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)[-1]
+
+
+def month_key(at: date | str | None) -> str | None:
+    """``YYYY-MM`` for a date/datetime (or an ISO string), the key of the month index."""
+    if at is None or at == "":
+        return None
+    if isinstance(at, str):
+        return at[:7]
+    return f"{at.year:04d}-{at.month:02d}"
+
+
+def _manual_table() -> dict[str, dict]:
+    return {
+        normalise_district(name): {**info, "readiness_high": info["flag"] == "HIGH", "source": "manual"}
+        for name, info in DISTRICT_RISK.items()
+    }
+
+
+def _read_monthly(base: str) -> pd.DataFrame | None:
+    """Observed monthly totals with a per-month ``flagged`` column."""
+    monthly = []
+    for path in sorted(glob.glob(os.path.join(base, "heavy_upload_months_*.csv"))):
+        df = pd.read_csv(path, usecols=["district", "month", "Total_Upload", "is_heavy"])
+        monthly.append(df.assign(state_code=_state_code(path), flagged=df["is_heavy"].astype(bool)))
+    for path in sorted(glob.glob(os.path.join(base, "alert_status_*.csv"))):
+        df = pd.read_csv(path, usecols=["district", "month", "Total_Upload", "Alert_Status"])
+        monthly.append(
+            df.assign(state_code=_state_code(path), flagged=df["Alert_Status"].eq("HIGH LOAD ALERT"))
+        )
+    if not monthly:
+        return None
+
+    frame = pd.concat(monthly, ignore_index=True)
+    frame["key"] = frame["district"].map(normalise_district)
+    # Step 4 writes months as YYYY-MM-01, step 10 as YYYY-MM.
+    frame["month"] = frame["month"].astype(str).str[:7]
+    return frame
+
+
+def load_district_table(base: str = BASE, monthly: pd.DataFrame | None = None) -> dict[str, dict]:
+    """Build the normalised district -> risk info table.
+
+    A district is HIGH when any of its months was flagged by step 4
+    (``is_heavy``) or step 10 (``HIGH LOAD ALERT``), or when its readiness
+    index (step 11, or mean / (mean + 2 std) of its monthly totals when
+    step 11 was not run for its state) reaches ``HIGH_READINESS``.
+    """
+    table = _manual_table()
+    frame = _read_monthly(base) if monthly is None else monthly
+    if frame is None:
+        return table
+
+    readiness_by_state = {}
+    for path in glob.glob(os.path.join(base, "resource_priority_*.csv")):
+        priority = pd.read_csv(path, usecols=["Readiness_Index"])
+        if not priority.empty:
+            readiness_by_state[_state_code(path)] = float(priority["Readiness_Index"].iloc[0])
+
+    for key, rows in frame.groupby("key"):
+        state_code = rows["state_code"].iloc[0]
+        readiness = readiness_by_state.get(state_code)
+        if readiness is None:
+            # Both sources repeat the same monthly totals; count each once.
+            totals = rows.drop_duplicates(subset=["month"])["Total_Upload"]
+            mean, std = totals.mean(), totals.std()
+            readiness = round(float(mean / (mean + 2 * std)), 3) if std > 0 else None
+        readiness_high = readiness is not None and readiness >= HIGH_READINESS
+        table[key] = {
+            "flag": "HIGH" if readiness_high or bool(rows["flagged"].any()) else "NORMAL",
+            "readiness": readiness,
+            "readiness_high": readiness_high,
+            "district": rows["district"].iloc[0],
+            "source": "data",
+        }
+    return table
+
+
+def load_month_index(base: str = BASE, monthly: pd.DataFrame | None = None) -> dict[tuple[str, str], bool]:
+    """``(district key, YYYY-MM) -> heavy`` for observed and forecast months.
+
+    Observed months use the step 4 / step 10 flags. Step 8 forecasts
+    (``forecast_<district>.csv``) are heavy when the forecast exceeds the
+    district's mean + 2 std of observed totals, the same threshold; an
+    observed month always wins over a forecast for it.
+    """
+    frame = _read_monthly(base) if monthly is None else monthly
+    index: dict[tuple[str, str], bool] = {}
+    thresholds: dict[str, float] = {}
+    if frame is not None:
+        observed = frame.groupby(["key", "month"])["flagged"].any()
+        index = {pair: bool(flag) for pair, flag in observed.items()}
+        for key, rows in frame.drop_duplicates(subset=["key", "month"]).groupby("key"):
+            totals = rows["Total_Upload"]
+            thresholds[key] = totals.mean() + 2 * totals.std()
+
+    for path in glob.glob(os.path.join(base, "forecast_*.csv")):
+        name = os.path.splitext(os.path.basename(path))[0].split("_", 1)[1]
+        key = normalise_district(name.replace("_", " "))
+        threshold = thresholds.get(key)
+        if threshold is None or pd.isna(threshold):
+            continue
+        forecast = pd.read_csv(path, usecols=["month", "forecast_Total_Upload"])
+        for month, value in zip(forecast["month"].astype(str).str[:7], forecast["forecast_Total_Upload"]):
+            index.setdefault((key, month), bool(value > threshold))
+    return index
+
+
+class DistrictRiskTable:
+    """Dict-backed lookup that rebuilds itself when the source CSVs change.
+
+    File modification times are checked at most every ``reload_seconds``;
+    a rebuilt table replaces the old one in a single assignment, so
+    lookups never take a lock.
+    """
+
+    def __init__(self, base: str = BASE, reload_seconds: float = RISK_RELOAD_SECONDS):
+        self.base = base
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        # (district table, month index), replaced together on reload.
+        self._state: tuple[dict[str, dict], dict[tuple[str, str], bool]] = ({}, {})
+        self.maybe_reload(force=True)
+
+    def _current_signature(self) -> tuple:
+        paths = sorted(
+            path
+            for pattern in SOURCE_PATTERNS
+            for path in glob.glob(os.path.join(self.base, pattern))
+        )
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            self._next_check = now + self.reload_seconds
+            signature = self._current_signature()
+            if signature == self._signature:
+                return False
+            try:
+                monthly = _read_monthly(self.base)
+                self._state = (
+                    load_district_table(self.base, monthly),
+                    load_month_index(self.base, monthly),
+                )
+            except (OSError, ValueError, KeyError):
+                # Keep serving the previous table; retry once the files change again.
+                logger.exception("District risk reload failed")
+                if not self._state[0]:
+                    self._state = (_manual_table(), {})
+            self._signature = signature
+            return True
+        finally:
+            self._lock.release()
+
+    def get(self, district: str | None) -> dict | None:
+        self.maybe_reload()
+        return self._state[0].get(normalise_district(district))
+
+    def flag(self, district: str | None, month: str | None = None) -> str | None:
+        """HIGH/NORMAL for the district, in ``month`` when the index covers it.
+
+        Months outside the observed and forecast range fall back to the
+        district-wide flag; unknown districts return None.
+        """
+        self.maybe_reload()
+        table, months = self._state
+        key = normalise_district(district)
+        info = table.get(key)
+        if info is None:
+            return None
+        if month is not None:
+            heavy = months.get((key, month))
+            if heavy is not None:
+                return "HIGH" if heavy or info["readiness_high"] else "NORMAL"
+        return info["flag"]
+
+    def snapshot(self) -> dict[str, dict]:
+        self.maybe_reload()
+        return dict(self._state[0])
+
+
+district_risk = DistrictRiskTable()
+
+
+def risk_score_for_month(district: str, month: str | None) -> int:
+    flag = district_risk.flag(district, month)
+    if flag is None:
         return 15  # unknown district = mild risk
-    if info["flag"] == "HIGH":
+    if flag == "HIGH":
         return 25  # high load district = higher fraud risk
     return 0       # normal district = no extra risk
+
+
+def get_district_risk_score(district: str, at: date | None = None) -> int:
+    """District risk points, for the load period containing ``at`` when given."""
+    return risk_score_for_month(district, month_key(at))
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+# Multipart boundaries, part headers and small form fields around the file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+TOO_LARGE_DETAIL = "File too large. Maximum size is 2MB."
+UPLOAD_CHUNK_BYTES = int(os.getenv("KYC_UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+
+MAGIC_BYTES = {
+    ".jpg": (b"\xff\xd8\xff", "File is not a valid JPEG image."),
+    ".jpeg": (b"\xff\xd8\xff", "File is not a valid JPEG image."),
+    ".png": (b"\x89PNG\r\n\x1a\n", "File is not a valid PNG image."),
+    ".pdf": (b"%PDF", "File is not a valid PDF."),
+}
+MAGIC_PROBE_BYTES = max(len(magic) for magic, _ in MAGIC_BYTES.values())
+
+
+class UploadRejected(Exception):
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+@dataclass
+class IngestedUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+def ingest_upload(
+    stream: BinaryIO,
+    ext: str,
+    dest_path: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+) -> IngestedUpload:
+    """Stream an upload to ``dest_path`` in fixed-size chunks.
+
+    The magic bytes are checked as soon as the first bytes arrive, the size
+    limit is enforced while reading and the SHA-256 is computed on the fly.
+    Data is written to a temporary file next to ``dest_path`` and only moved
+    into place once the whole upload has been accepted, so a rejected upload
+    never leaves a partial file behind.
+    """
+    magic, magic_error = MAGIC_BYTES[ext]
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+
+    dest_dir = os.path.dirname(dest_path) or "."
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(TOO_LARGE_DETAIL)
+                if len(head) < MAGIC_PROBE_BYTES:
+                    head += chunk[: MAGIC_PROBE_BYTES - len(head)]
+                    if len(head) >= len(magic) and not head.startswith(magic):
+                        raise UploadRejected(magic_error)
+                digest.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            raise UploadRejected("File is empty or corrupted.")
+        if not head.startswith(magic):
+            raise UploadRejected(magic_error)
+
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return IngestedUpload(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """Refuse upload requests whose body exceeds ``max_body_bytes`` before it is received.
+
+    The framework parses and spools the whole multipart body before the
+    handler runs, so ``ingest_upload``'s limit alone still receives an
+    oversized file in full. This ASGI middleware answers 413 at once when
+    ``Content-Length`` is over the limit and otherwise counts body chunks as
+    they are read, answering 413 and aborting the read at the limit
+    (chunked uploads have no length).
+    """
+
+    def __init__(self, app, paths: tuple[str, ...], max_body_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = paths
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_body_bytes:
+                    await _send_too_large(send)
+                    return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Answer here: the framework turns errors raised while
+                    # parsing the body into its own 400 response.
+                    if not response_started and not rejected:
+                        rejected = True
+                        await _send_too_large(send)
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if rejected:
+                return  # the 413 has been sent; drop the app's error response
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except Exception:
+            if not rejected:
+                raise
+
+
+async def _send_too_large(send) -> None:
+    body = json.dumps({"detail": TOO_LARGE_DETAIL}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,147 @@
+import os
+
+from .face_detection import detect_faces
+from .image_pipeline import DecodedImage
+from .ocr_engine import OCR_LANG, get_ocr_engine, in_process_ocr
+from .roi_ocr import ROI_MAX_LINES, extract_fields, find_aadhaar_number
+from . import pdf_pipeline
+
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png"]
+OCR_VARIANT = os.getenv("KYC_OCR_VARIANT", "gray")  # "gray", "binarized" or "deskewed"
+OCR_MODE = os.getenv("KYC_OCR_MODE", "full")  # "full" or "roi"
+# ROI mode makes one OCR call per candidate line; with a tesseract process per
+# call that is slower than a single full-page pass, so it needs the pool engine.
+ROI_ENABLED = OCR_MODE == "roi" and in_process_ocr()
+# Settings that change analyse_document's output; part of the result cache key.
+ANALYSIS_CONFIG = "-".join(
+    [f"roi{ROI_MAX_LINES}" if ROI_ENABLED else "full", OCR_VARIANT, OCR_LANG]
+)
+
+OCR_FAILED_FLAG = "OCR processing failed"
+
+
+def _full_page_ocr(decoded: DecodedImage) -> str:
+    ocr_image = getattr(decoded, OCR_VARIANT)
+    with decoded.timed("ocr"):
+        return get_ocr_engine().image_to_string(ocr_image)
+
+
+def _analyse_image(decoded: DecodedImage) -> dict:
+    with decoded.timed("face"):
+        faces = detect_faces(decoded.gray)
+
+    ocr_text = ""
+    aadhaar_found = False
+    ocr_failed = False
+    ocr_path = "full_page"
+    try:
+        fields = None
+        if ROI_ENABLED:
+            face_box = max(faces, key=lambda box: box[2] * box[3]) if faces else None
+            with decoded.timed("ocr_roi"):
+                fields = extract_fields(get_ocr_engine(), getattr(decoded, OCR_VARIANT), face_box)
+            ocr_path = "roi" if fields is not None else "roi_fallback"
+
+        if fields is not None:
+            ocr_text = fields["ocr_text"]
+            aadhaar_found = True
+        else:
+            ocr_text = _full_page_ocr(decoded)
+            aadhaar_found = find_aadhaar_number(ocr_text) is not None
+    except Exception:
+        ocr_failed = True
+
+    return {
+        "ocr_text": ocr_text,
+        "aadhaar_found": aadhaar_found,
+        "ocr_failed": ocr_failed,
+        "ocr_path": ocr_path,
+        "face_detected": len(faces) > 0,
+    }
+
+
+def analyse_document(path: str, ext: str) -> dict:
+    """Run OCR and face detection over the document stored at ``path``.
+
+    The result only depends on the document bytes and ``ANALYSIS_CONFIG``,
+    so it can be cached by content hash and config; the applicant-specific name check happens in
+    ``build_verification``. Kept free of request state so it can run inline
+    or inside a worker process of the verification job queue.
+    """
+    ocr_flags: list[str] = []
+    timings_ms: dict[str, float] = {}
+    page = None
+
+    if ext in IMAGE_EXTENSIONS:
+        decoded = DecodedImage.decode_file(path)
+        if decoded is not None:
+            page = _analyse_image(decoded)
+            timings_ms = decoded.timings_ms
+    elif ext == ".pdf" and pdf_pipeline.PDF_SUPPORTED:
+        try:
+            page = pdf_pipeline.analyse_pdf(path, _analyse_image)
+        except Exception:
+            page = None
+        else:
+            ocr_flags.extend(page["flags"])
+            timings_ms = page["timings_ms"]
+    else:
+        ocr_flags.append("OCR not run for non-image document")
+
+    if page is None and not ocr_flags:
+        ocr_flags.append(OCR_FAILED_FLAG)
+    elif page is not None and page["ocr_failed"]:
+        ocr_flags.insert(0, OCR_FAILED_FLAG)
+
+    ocr_paths: list[str] = []
+    if page is not None:
+        ocr_paths = page["ocr_paths"] if "ocr_paths" in page else [page["ocr_path"]]
+
+    face_message = "Face detection not run"
+    if page is not None:
+        if page["face_detected"]:
+            face_message = "Face detected in document"
+        else:
+            face_message = "No face detected in document - may not be a valid ID"
+
+    return {
+        "ocr_text": page["ocr_text"] if page is not None else "",
+        "ocr_flags": ocr_flags,
+        "aadhaar_found": page["aadhaar_found"] if page is not None else False,
+        "face_detected": page["face_detected"] if page is not None else False,
+        "face_message": face_message,
+        "ocr_paths": ocr_paths,
+        "timings_ms": timings_ms,
+    }
+
+
+def is_cacheable(analysis: dict) -> bool:
+    # A failed OCR run may be transient (timeouts, crashed worker).
+    return OCR_FAILED_FLAG not in analysis["ocr_flags"]
+
+
+def build_verification(analysis: dict, name: str = "") -> dict:
+    flags = list(analysis["ocr_flags"])
+
+    name_found = False
+    if name and OCR_FAILED_FLAG not in flags:
+        normalized_name = name.strip().lower()
+        if normalized_name in analysis["ocr_text"].lower():
+            name_found = True
+
+    if not analysis["aadhaar_found"]:
+        flags.append("No Aadhaar number detected in document")
+    if name and not name_found:
+        flags.append("Name mismatch between form and document")
+    if analysis["face_message"] == "No face detected in document - may not be a valid ID":
+        flags.append(analysis["face_message"])
+
+    return {
+        "ocr_text": analysis["ocr_text"],
+        "aadhaar_found": analysis["aadhaar_found"],
+        "name_found": name_found,
+        "flags": flags,
+        "face_detected": analysis["face_detected"],
+        "face_message": analysis["face_message"],
+        "timings_ms": analysis["timings_ms"],
+    }
@@ -0,0 +1,91 @@
+"""Check the vectorised KYC scorer against the scalar one and compare throughput.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_batch_scoring --rows 200000
+
+Exits non-zero if any row's score, status, reasons or district risk differ.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.scoring import calculate_kyc_decision, score_frame
+from app.uidai_risk import DISTRICT_RISK
+
+NAMES = ["Priya Raman", "Al", "", "  ", "R2D2", "Anil-Kumar", "Élodie Ñúñez", "தமிழ் செல்வி", "Ravi  Shankar"]
+AADHAAR = ["112345678901", "223456789012", "334567890123", "012345678901", "12345678901", "1234567890123", "11234567890a", ""]
+DISTRICTS = list(DISTRICT_RISK) + ["Pune", "chennai", ""]
+# Spans observed, forecast and uncovered months of the analysis outputs.
+SUBMITTED = pd.date_range("2025-01-01", "2026-12-01", freq="17D")
+
+
+def _applicants(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "name": rng.choice(NAMES, rows),
+            "aadhaar_number": rng.choice(AADHAAR, rows),
+            "district": rng.choice(DISTRICTS, rows),
+            "age": rng.integers(10, 80, rows),
+            "submission_date": rng.choice(SUBMITTED.to_pydatetime(), rows),
+        }
+    )
+
+
+def _scalar(applicants: pd.DataFrame) -> list[tuple]:
+    return [
+        calculate_kyc_decision(name=n, aadhaar_number=a, district=d, age=int(g), at=t)
+        for n, a, d, g, t in zip(
+            applicants["name"],
+            applicants["aadhaar_number"],
+            applicants["district"],
+            applicants["age"],
+            applicants["submission_date"],
+        )
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    applicants = _applicants(args.rows, args.seed)
+
+    start = time.perf_counter()
+    expected = _scalar(applicants)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scored = score_frame(applicants)
+    vector_seconds = time.perf_counter() - start
+
+    actual = list(
+        zip(scored["risk_score"], scored["status"], scored["reasons"], scored["uidai_district_risk"])
+    )
+    mismatches = [
+        i for i, (e, a) in enumerate(zip(expected, actual))
+        if (e[0], e[1], e[2], e[3]) != (int(a[0]), a[1], list(a[2]), int(a[3]))
+    ]
+    if mismatches:
+        i = mismatches[0]
+        print(f"PARITY FAILURE: {len(mismatches)} rows differ; first is row {i}")
+        print("  input     :", applicants.iloc[i].to_dict())
+        print("  scalar    :", expected[i])
+        print("  vectorised:", actual[i])
+        return 1
+
+    print(f"parity     : OK ({args.rows} rows)")
+    print(f"scalar     : {args.rows / scalar_seconds:12.0f} rows/sec")
+    print(f"vectorised : {args.rows / vector_seconds:12.0f} rows/sec")
+    print(f"speedup    : {scalar_seconds / vector_seconds:12.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Compare OCR throughput of the per-call subprocess path and the warm worker pool.
+
+The pool needs tesserocr. Run from the backend directory:
+
+    python -m benchmarks.bench_ocr [image ...] --docs 64 --concurrency 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.ocr_engine import PooledOcrEngine, SubprocessOcrEngine
+
+
+def _sample_image() -> np.ndarray:
+    image = Image.new("L", (900, 300), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.text((40, 60), "GOVERNMENT OF INDIA", fill=0)
+    draw.text((40, 120), "Name: Sample Applicant", fill=0)
+    draw.text((40, 180), "1234 5678 9012", fill=0)
+    return np.asarray(image)
+
+
+def _run(engine, images: list, docs: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(engine.image_to_string, (images[i % len(images)] for i in range(docs))))
+    return docs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="*", help="document images to OCR (default: synthetic card)")
+    parser.add_argument("--docs", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    images = [np.asarray(Image.open(p).convert("L")) for p in args.images] or [_sample_image()]
+
+    subprocess_engine = SubprocessOcrEngine()
+    pooled_engine = PooledOcrEngine(size=args.concurrency)
+    try:
+        # warm both paths so pool start-up is not charged to the first batch
+        subprocess_engine.image_to_string(images[0])
+        _run(pooled_engine, images, args.concurrency, args.concurrency)
+
+        subprocess_rate = _run(subprocess_engine, images, args.docs, args.concurrency)
+        pooled_rate = _run(pooled_engine, images, args.docs, args.concurrency)
+    finally:
+        pooled_engine.close()
+
+    print(f"docs={args.docs} concurrency={args.concurrency}")
+    print(f"subprocess : {subprocess_rate:8.2f} docs/sec")
+    print(f"pool       : {pooled_rate:8.2f} docs/sec")
+    print(f"speedup    : {pooled_rate / subprocess_rate:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Load-test the read path: sync sessions in worker threads vs AsyncSession.
+
+Seeds a scratch database (temporary SQLite by default) and fires the
+/kyc/history queries at it from many concurrent tasks, once through the
+sync engine on a thread limiter the size of Starlette's default
+threadpool, and once through the async engine.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_db --concurrency 200 --requests 5000
+    python -m benchmarks.load_db --database-url postgresql://localhost/kyc_load
+
+The async path needs aiosqlite or asyncpg installed.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.database import make_async_engine, make_engine  # noqa: E402
+from app.migrations import seed_plan_database, upgrade  # noqa: E402
+from app.summary import user_status_counts_query  # noqa: E402
+from app import models  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+STARLETTE_THREADS = 40
+
+
+def _history_queries(user_id: int):
+    return (
+        select(models.KYC)
+        .where(models.KYC.user_id == user_id)
+        .order_by(models.KYC.submission_date.desc()),
+        user_status_counts_query(user_id),
+    )
+
+
+async def _run(label: str, worker, requests: int, concurrency: int, users: int) -> None:
+    rng = random.Random(1)
+    user_ids = [rng.randint(1, users) for _ in range(requests)]
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(user_id: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await worker(user_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(u) for u in user_ids))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{label:<6} {requests / elapsed:10.1f} req/sec   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+
+
+async def main_async(args) -> None:
+    sync_engine = make_engine(args.database_url)
+    upgrade(sync_engine, log=lambda message: None)
+    seed_plan_database(sync_engine, rows=args.rows, users=args.users)
+    SyncSession = sessionmaker(bind=sync_engine)
+
+    limiter = anyio.CapacityLimiter(STARLETTE_THREADS)
+
+    def sync_history(user_id: int) -> None:
+        records_stmt, counts_stmt = _history_queries(user_id)
+        with SyncSession() as db:
+            db.execute(records_stmt).all()
+            db.execute(counts_stmt).all()
+
+    async def threaded(user_id: int) -> None:
+        await anyio.to_thread.run_sync(sync_history, user_id, limiter=limiter)
+
+    await _run("sync", threaded, args.requests, args.concurrency, args.users)
+
+    async_engine = make_async_engine(args.database_url)
+    AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession)
+
+    async def native(user_id: int) -> None:
+        records_stmt, counts_stmt = _history_queries(user_id)
+        async with AsyncSessionLocal() as session:
+            (await session.execute(records_stmt)).all()
+            (await session.execute(counts_stmt)).all()
+
+    await _run("async", native, args.requests, args.concurrency, args.users)
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.database_url is None:
+            args.database_url = f"sqlite:///{os.path.join(tmp_dir, 'load.db')}"
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
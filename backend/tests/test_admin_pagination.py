@@ -0,0 +1,102 @@
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+from app.kyc_queries import admin_page_query, build_page, encode_cursor, kyc_filters
+from app.migrations import upgrade
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'kyc.db'}")
+    # A database from before migrations: CURRENT_TIMESTAMP rows are stored
+    # without fractional seconds until the timestamp migration rewrites them.
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, hashed_password, is_admin) VALUES (1, 'applicant@example.com', 'x', 0)"))
+        for _ in range(3):
+            conn.execute(
+                text(
+                    "INSERT INTO kyc_records (user_id, name, aadhaar_number, district, age, submission_date, "
+                    "attempt_number, ocr_aadhaar_found, ocr_name_found, face_detected) "
+                    "VALUES (1, 'Priya Raman', '112345678901', 'Chennai', 30, '2025-06-01 11:59:59', 1, 0, 0, 0)"
+                )
+            )
+    upgrade(engine, log=lambda message: None)
+    with Session(engine) as session:
+        # Rows from the column default and resubmits with Python datetimes,
+        # some within the same second.
+        applicant = {"user_id": 1, "name": "Priya Raman", "aadhaar_number": "112345678901",
+                     "district": "Chennai", "age": 30}
+        for _ in range(3):
+            session.add(models.KYC(**applicant))
+        base = datetime(2025, 6, 1, 12, 0, 0)
+        for i in range(5):
+            session.add(
+                models.KYC(
+                    **applicant,
+                    submission_date=base + timedelta(microseconds=250_000 * (i % 3), seconds=i // 3),
+                )
+            )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def _walk(db, limit, filters=()):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows = db.execute(admin_page_query(list(filters), cursor, limit)).all()
+        records, cursor = build_page(rows, limit)
+        ids.extend(record["id"] for record in records)
+        pages += 1
+        assert pages <= 20, f"pagination did not terminate: {ids}"
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_walks_every_page_once(db, limit):
+    expected = [row.id for row in db.query(models.KYC.id).all()]
+    ids = _walk(db, limit)
+
+    assert sorted(ids) == sorted(expected)
+    assert len(ids) == len(set(ids))
+
+
+def test_pages_are_newest_first(db):
+    ids = _walk(db, 2)
+    dates = dict(db.query(models.KYC.id, models.KYC.submission_date).all())
+    ordered = [dates[i].replace(tzinfo=None) for i in ids]
+
+    assert ordered == sorted(ordered, reverse=True)
+
+
+def test_date_filter_includes_server_default_rows(db):
+    stored = db.query(models.KYC.submission_date).order_by(models.KYC.id).first()[0]
+    ids = _walk(db, 2, kyc_filters(date_from=stored, date_to=datetime(2025, 6, 1, 12, 0, 0)))
+
+    assert sorted(ids) == [1, 2, 3]
+
+
+def test_legacy_timestamps_are_rewritten(db):
+    stored = db.execute(text("SELECT DISTINCT submission_date FROM kyc_records WHERE id <= 3")).scalars().all()
+
+    assert stored == ["2025-06-01 11:59:59.000000"]
+
+
+@pytest.mark.parametrize("cursor", [None, encode_cursor(datetime(2025, 6, 1, 12, 0, 0), 5)])
+def test_pages_read_the_index_in_order(db, cursor):
+    stmt = admin_page_query([], cursor, 2)
+    sql = str(stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    assert any("ix_kyc_records_submission_date_id" in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
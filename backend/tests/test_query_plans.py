@@ -0,0 +1,46 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app import models
+from app.migrations import hot_queries, plan_problems, seed_plan_database, upgrade
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plan_check.db'}")
+    upgrade(engine, log=lambda message: None)
+    seed_plan_database(engine, rows=5_000, users=500)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def _sql(conn, stmt):
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize("name", sorted(hot_queries()))
+def test_hot_query_plan(conn, name):
+    assert plan_problems(conn, _sql(conn, hot_queries()[name])) == []
+
+
+def test_flags_sort_of_the_whole_table(conn):
+    kyc = models.KYC
+    stmt = (
+        select(kyc.id, models.User.email)
+        .join(models.User, kyc.user_id == models.User.id)
+        .order_by(func.strftime("%Y-%m-%d %H:%M:%f", kyc.submission_date).desc(), kyc.id.desc())
+        .limit(50)
+    )
+
+    assert any("TEMP B-TREE" in problem for problem in plan_problems(conn, _sql(conn, stmt)))
+
+
+def test_flags_full_scan_of_a_joined_table(conn):
+    stmt = select(models.User.email).where(models.User.hashed_password == "x")
+
+    assert plan_problems(conn, _sql(conn, stmt)) == ["SCAN users"]
@@ -0,0 +1,84 @@
+import io
+import itertools
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.scoring import INVALID_AGE_REASON, calculate_kyc_decision, score_applicants, score_frame
+from app.uidai_risk import DISTRICT_RISK
+
+NAMES = ["Priya Raman", "Al", "Abc", "", "  ", "R2D2", "Anil-Kumar", "Élodie Ñúñez", "Ravi  Shankar"]
+AADHAAR = ["112345678901", "223456789012", "012345678901", "12345678901", "1234567890123", "11234567890a", ""]
+DISTRICTS = sorted(DISTRICT_RISK)[:3] + ["Chennai", "Mumbai", "Delhi", "chennai", "Pune", ""]
+# Around the underage boundary and the extremes.
+AGES = [0, 17, 18, 19, 120]
+
+
+def _grid() -> pd.DataFrame:
+    rows = list(itertools.product(NAMES, AADHAAR, DISTRICTS, AGES))
+    return pd.DataFrame(rows, columns=["name", "aadhaar_number", "district", "age"])
+
+
+def _assert_parity(scored: pd.DataFrame, at_for_row) -> None:
+    for i, row in enumerate(scored.itertuples(index=False)):
+        expected = calculate_kyc_decision(
+            name=row.name, aadhaar_number=row.aadhaar_number, district=row.district, age=int(row.age),
+            at=at_for_row(row),
+        )
+        actual = (int(row.risk_score), row.status, list(row.reasons), int(row.uidai_district_risk))
+        assert actual == expected, f"row {i}: {row}"
+
+
+def test_parity_for_load_period():
+    at = datetime(2025, 6, 15)
+    _assert_parity(score_frame(_grid(), at=at), lambda row: at)
+
+
+def test_parity_without_a_period():
+    _assert_parity(score_frame(_grid()), lambda row: None)
+
+
+def test_parity_for_each_rows_submission_date():
+    applicants = _grid()
+    months = pd.date_range("2025-01-01", "2026-12-01", freq="MS").to_pydatetime()
+    applicants["submission_date"] = np.resize(months, len(applicants))
+
+    _assert_parity(score_frame(applicants), lambda row: row.submission_date)
+
+
+@pytest.mark.parametrize("age", [None, np.nan, "", "abc", "18y"])
+def test_invalid_age_is_an_error_row(age):
+    applicants = pd.DataFrame(
+        {
+            "name": ["Priya Raman", "Priya Raman", "Ravi Shankar"],
+            "aadhaar_number": ["112345678901"] * 3,
+            "district": ["Chennai"] * 3,
+            "age": pd.Series([30, age, 16], dtype=object),
+        }
+    )
+    scored = score_frame(applicants, at=datetime(2025, 6, 15))
+
+    error = scored.iloc[1]
+    assert (error["status"], error["risk_score"], error["reasons"]) == ("ERROR", 0, [INVALID_AGE_REASON])
+    valid = scored.iloc[[0, 2]].assign(age=lambda df: df["age"].astype(int))
+    _assert_parity(valid, lambda row: datetime(2025, 6, 15))
+
+
+def test_error_rows_do_not_stop_the_batch():
+    csv = "name,aadhaar_number,district,age\nPriya Raman,112345678901,Chennai,30\nRavi,,,\nAnil Kumar,223456789012,Mumbai,abc\nRavi Shankar,112345678901,Chennai,16\n"
+    lines = "".join(score_applicants(io.StringIO(csv), "csv", at=datetime(2025, 6, 15))).splitlines()
+    decisions = [json.loads(line) for line in lines]
+
+    assert [d["status"] for d in decisions[1:3]] == ["ERROR", "ERROR"]
+    assert all(d["reasons"] == [INVALID_AGE_REASON] for d in decisions[1:3])
+    assert decisions[3]["status"] != "ERROR"
+    assert len(decisions) == 4
+
+
+def test_missing_column_is_rejected():
+    csv = "name,aadhaar_number,age\nPriya Raman,112345678901,30\n"
+    with pytest.raises(ValueError, match="district"):
+        list(score_applicants(io.StringIO(csv), "csv"))
@@ -0,0 +1,73 @@
+import json
+
+import anyio
+import pytest
+
+from app.uploads import TOO_LARGE_DETAIL, UploadSizeLimitMiddleware
+
+LIMIT = 1000
+
+
+class BodyParseError(Exception):
+    pass
+
+
+async def _reading_app(scope, receive, send):
+    """Reads the whole body like a form parser, wrapping errors like the framework does."""
+    body = b""
+    try:
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+    except Exception as exc:
+        await send({"type": "http.response.start", "status": 400, "headers": []})
+        await send({"type": "http.response.body", "body": b"parse error"})
+        raise BodyParseError() from exc
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(len(body)).encode()})
+
+
+def _call(path, chunks, content_length=None):
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    scope = {"type": "http", "path": path, "headers": headers}
+    pending = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    read = []
+    sent = []
+
+    async def receive():
+        message = pending.pop(0)
+        read.append(message)
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    app = UploadSizeLimitMiddleware(_reading_app, paths=("/kyc/upload",), max_body_bytes=LIMIT)
+    anyio.run(app, scope, receive, send)
+    return sent[0]["status"], b"".join(m.get("body", b"") for m in sent[1:]), len(read)
+
+
+def test_declared_length_over_the_limit_is_refused_unread():
+    status, body, read = _call("/kyc/upload", [b"x" * 600] * 4, content_length=2400)
+
+    assert (status, read) == (413, 0)
+    assert json.loads(body) == {"detail": TOO_LARGE_DETAIL}
+
+
+def test_streamed_body_stops_at_the_limit():
+    status, body, read = _call("/kyc/upload", [b"x" * 600] * 10)
+
+    assert (status, read) == (413, 2)
+    assert json.loads(body) == {"detail": TOO_LARGE_DETAIL}
+
+
+@pytest.mark.parametrize("path, chunks", [("/kyc/upload", [b"x" * 500, b"x" * 500]), ("/kyc/submit", [b"x" * 3000])])
+def test_other_requests_pass_through(path, chunks):
+    status, body, _ = _call(path, chunks, content_length=sum(map(len, chunks)))
+
+    assert (status, body) == (200, str(sum(map(len, chunks))).encode())
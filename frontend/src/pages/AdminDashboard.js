@@ -7,6 +7,26 @@ function AdminDashboard() {
   const [statusFilter, setStatusFilter] = useState('ALL');
   const navigate = useNavigate();
 
+  const fetchPage = async (cursor) => {
+    const token = localStorage.getItem('token');
+    const params = {};
+    if (statusFilter !== 'ALL') params.status = statusFilter;
+    if (cursor) params.cursor = cursor;
+    try {
+      const res = await axios.get('http://127.0.0.1:8000/admin/all-kyc', {
+        headers: { Authorization: `Bearer ${token}` },
+        params
+      });
+      setData(prev =>
+        cursor && prev
+          ? { ...res.data, records: [...prev.records, ...res.data.records] }
+          : res.data
+      );
+    } catch (err) {
+      navigate('/login');
+    }
+  };
+
   useEffect(() => {
     const token = localStorage.getItem('token');
     const isAdmin = localStorage.getItem('is_admin') === 'true';
@@ -14,18 +34,9 @@ function AdminDashboard() {
       navigate('/login');
       return;
     }
-    const fetchAll = async () => {
-      try {
-        const res = await axios.get('http://127.0.0.1:8000/admin/all-kyc', {
-          headers: { Authorization: `Bearer ${token}` }
-        });
-        setData(res.data);
-      } catch (err) {
-        navigate('/login');
-      }
-    };
-    fetchAll();
-  }, [navigate]);
+    fetchPage(null);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [navigate, statusFilter]);
 
   const statusColor = {
     APPROVED: '#10B981',
@@ -33,9 +44,7 @@ function AdminDashboard() {
     REJECTED: '#EF4444'
   };
 
-  const filteredRecords = data
-    ? data.records.filter(r => statusFilter === 'ALL' || r.status === statusFilter)
-    : [];
+  const filteredRecords = data ? data.records : [];
 
   return (
     <div style={styles.container}>
@@ -111,7 +120,7 @@ function AdminDashboard() {
                   </thead>
                   <tbody>
                     {filteredRecords.map((r, i) => (
-                      <tr key={i} style={styles.tr}>
+                      <tr key={r.id ?? i} style={styles.tr}>
                         <td style={styles.td}>{r.email}</td>
                         <td style={styles.td}>{r.name}</td>
                         <td style={styles.td}>{r.district}</td>
@@ -138,6 +147,14 @@ function AdminDashboard() {
                   </tbody>
                 </table>
               )}
+              {data.next_cursor && (
+                <button
+                  style={styles.loadMoreBtn}
+                  onClick={() => fetchPage(data.next_cursor)}
+                >
+                  Load more
+                </button>
+              )}
             </div>
           </>
         )}
@@ -157,6 +174,17 @@ const styles = {
     paddingTop: '20px'
   },
   title: { color: '#00E5FF', fontSize: '22px' },
+  loadMoreBtn: {
+    display: 'block',
+    margin: '16px auto 0',
+    background: 'transparent',
+    color: '#00E5FF',
+    border: '1px solid #00E5FF',
+    padding: '8px 16px',
+    borderRadius: '8px',
+    cursor: 'pointer',
+    fontSize: '13px'
+  },
   logoutBtn: {
     background: 'transparent',
     color: '#EF4444',
@@ -0,0 +1,124 @@
+"""Check the vectorised anomaly engine against per-district scripts and time both.
+
+Builds synthetic monthly totals for thousands of districts (some with
+missing months or a single month), flags them with
+``uidai_anomaly.detect_anomalies`` and with the single-district logic of
+steps 4, 7 and 10 (mean + k std and a row-wise ``apply``) run once per
+district, and cross-checks the robust and quantile levels against pandas
+groupby. Run from the uidai-upload-analysis directory:
+
+    python analysis/bench_uidai_anomaly.py --districts 500 2000 5000
+
+Exits non-zero if any month's flag differs.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from uidai_anomaly import ALERT, DISTRICT_KEYS, LEVELS, MAD_SCALE, VALUE, detect_anomalies
+
+MONTHS = pd.period_range("2023-01", periods=36, freq="M").astype(str)
+
+
+def _monthly(districts, seed):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "state": np.repeat([f"State {d % 36:02d}" for d in range(districts)], len(MONTHS)),
+            "district": np.repeat([f"District {d:05d}" for d in range(districts)], len(MONTHS)),
+            "month": np.tile(MONTHS, districts),
+        }
+    )
+    scale = np.repeat(rng.lognormal(10, 1, districts), len(MONTHS))
+    totals = rng.normal(1.0, 0.15, len(frame)) * scale
+    # Occasional surges for the detector to find.
+    totals *= np.where(rng.random(len(frame)) < 0.03, rng.uniform(1.5, 3.0, len(frame)), 1.0)
+    frame[VALUE] = np.maximum(totals, 0).round().astype("int64")
+
+    keep = rng.random(len(frame)) > 0.1
+    # Every tenth district reported a single month.
+    single = frame["district"].str[-1].eq("7").to_numpy()
+    keep &= ~single | frame["month"].eq(MONTHS[0]).to_numpy()
+    return frame[keep].reset_index(drop=True)
+
+
+def _per_district(monthly):
+    """The step scripts' logic, run once per district."""
+    flags = {level: pd.Series(False, index=monthly.index) for level in ("sensitive", "heavy")}
+    status = pd.Series("NORMAL", index=monthly.index)
+    for _, df in monthly.groupby(DISTRICT_KEYS, sort=False):
+        mean_upload = df[VALUE].mean()
+        std_upload = df[VALUE].std()
+        flags["sensitive"][df.index] = df[VALUE] > mean_upload + 1.5 * std_upload
+        heavy_threshold = mean_upload + 2 * std_upload
+
+        def generate_alert(upload):
+            if upload > heavy_threshold:
+                return ALERT
+            else:
+                return "NORMAL"
+
+        flags["heavy"][df.index] = df[VALUE] > heavy_threshold
+        status[df.index] = df[VALUE].apply(generate_alert)
+    return flags, status
+
+
+def _grouped_robust(monthly):
+    grouped = monthly.groupby(DISTRICT_KEYS, sort=False)[VALUE]
+    median = grouped.transform("median")
+    mad = (monthly[VALUE] - median).abs().groupby([monthly[k] for k in DISTRICT_KEYS], sort=False).transform("median")
+    robust = monthly[VALUE] > median + LEVELS["robust"][1] * MAD_SCALE * mad
+    q90 = monthly[VALUE] > grouped.transform(lambda s: s.quantile(LEVELS["q90"][1]))
+    return robust, q90
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--districts", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'districts':>10} {'rows':>8} {'engine s':>9} {'per-district s':>15} {'speed-up':>9} {'alerts':>7}")
+    for districts in args.districts:
+        monthly = _monthly(districts, args.seed)
+
+        start = time.perf_counter()
+        alerts = detect_anomalies(monthly)
+        engine_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        flags, status = _per_district(monthly)
+        loop_seconds = time.perf_counter() - start
+
+        robust, q90 = _grouped_robust(monthly)
+        checks = {
+            "sensitive": flags["sensitive"],
+            "heavy": flags["heavy"],
+            "robust": robust,
+            "q90": q90,
+        }
+        for level, expected in checks.items():
+            mismatches = np.flatnonzero(alerts[level].to_numpy() != expected.to_numpy(dtype=bool))
+            if len(mismatches):
+                i = mismatches[0]
+                print(f"PARITY FAILURE: {level} differs in {len(mismatches)} months; first is row {i}")
+                print("  input:", monthly.iloc[i].to_dict())
+                return 1
+        if not alerts["Alert_Status"].equals(status):
+            print("PARITY FAILURE: Alert_Status differs from the row-wise apply")
+            return 1
+
+        print(
+            f"{districts:>10} {len(monthly):>8} {engine_seconds:>9.3f} {loop_seconds:>15.3f} "
+            f"{loop_seconds / engine_seconds:>8.1f}x {int((alerts['Alert_Status'] == ALERT).sum()):>7}"
+        )
+
+    print("All levels match the per-district computation.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
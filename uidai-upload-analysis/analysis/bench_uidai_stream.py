@@ -0,0 +1,133 @@
+"""Compare peak memory and throughput of in-memory and streaming aggregation.
+
+Writes synthetic all-India enrolment, biometric and demographic CSVs of
+increasing size to a temporary directory, then aggregates each size once
+with ``uidai_pipeline.aggregate_files`` (whole files in memory) and once
+with ``uidai_stream.aggregate_streaming``, each in a fresh process so its
+peak RSS is its own. Run from the uidai-upload-analysis directory:
+
+    python analysis/bench_uidai_stream.py --rows 500000 1000000 2000000
+
+Exits non-zero if the two engines produce different totals.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from uidai_pipeline import SOURCES
+
+STATES = 36
+DISTRICTS_PER_STATE = 22
+DATES = pd.date_range("2025-03-01", "2026-01-31").strftime("%d-%m-%Y")
+WRITE_CHUNK_ROWS = 500_000
+
+
+def write_source(path, source, rows, seed):
+    """Write ``rows`` synthetic daily rows in chunks, without holding them all."""
+    rng = np.random.default_rng(seed)
+    age_columns, _ = SOURCES[source]
+    states = np.array([f"State {s:02d}" for s in range(STATES)])
+    for start in range(0, rows, WRITE_CHUNK_ROWS):
+        n = min(WRITE_CHUNK_ROWS, rows - start)
+        state = rng.integers(0, STATES, n)
+        district = rng.integers(0, DISTRICTS_PER_STATE, n)
+        chunk = pd.DataFrame(
+            {
+                "date": rng.choice(DATES, n),
+                "state": states[state],
+                "district": np.char.add(np.char.add(states[state], " District "), district.astype(str)),
+                "pincode": rng.integers(100000, 999999, n),
+                **{column: rng.integers(0, 50, n) for column in age_columns},
+            }
+        )
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def _peak_rss_mb():
+    # Sizes in KiB. Linux carries ru_maxrss for RUSAGE_SELF over from the
+    # forking parent across exec, so prefer this process's own VmHWM.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        with open("/proc/self/status") as status:
+            own = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        pass
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, workers) / 1024
+
+
+def _run_engine(engine, files, output, chunk_rows, workers):
+    """Child process: aggregate once and report seconds and peak RSS as JSON."""
+    start = time.perf_counter()
+    if engine == "memory":
+        from uidai_pipeline import aggregate_files
+
+        merged = aggregate_files(files, use_cache=False)
+    else:
+        from uidai_stream import aggregate_streaming
+
+        merged, _ = aggregate_streaming(files, chunk_rows=chunk_rows, workers=workers, use_cache=False)
+    seconds = time.perf_counter() - start
+    merged.to_csv(output, index=False)
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def _measure(engine, files, output, chunk_rows, workers):
+    command = [
+        sys.executable, __file__, "--run", engine,
+        "--files", json.dumps(files), "--output", output,
+        "--chunk-rows", str(chunk_rows), "--workers", str(workers),
+    ]
+    result = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[250_000, 1_000_000, 2_000_000],
+                        help="rows per source file, one run per value")
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--run", choices=["memory", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--files", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        _run_engine(args.run, json.loads(args.files), args.output, args.chunk_rows, args.workers)
+        return 0
+
+    print(f"{'rows/source':>12} {'engine':>7} {'seconds':>8} {'rows/sec':>10} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            files = {}
+            for i, source in enumerate(SOURCES):
+                files[source] = os.path.join(tmp, f"{source}.csv")
+                write_source(files[source], source, rows, args.seed + i)
+
+            outputs = {}
+            for engine in ("memory", "stream"):
+                outputs[engine] = os.path.join(tmp, f"{engine}.csv")
+                stats = _measure(engine, files, outputs[engine], args.chunk_rows, args.workers)
+                rate = 3 * rows / stats["seconds"]
+                print(f"{rows:>12} {engine:>7} {stats['seconds']:>8.2f} {rate:>10.0f} {stats['peak_rss_mb']:>12.0f}")
+
+            if not pd.read_csv(outputs["memory"]).equals(pd.read_csv(outputs["stream"])):
+                print(f"PARITY FAILURE: totals differ at {rows} rows per source")
+                return 1
+
+    print("Streaming totals match the in-memory aggregation.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from uidai_anomaly import LEVELS, district_thresholds, flag_months
+
 # -------- CONFIG --------
 INPUT_FILE = "analysis/monthly_total_upload_TN.csv"
 OUTPUT_FILE = "analysis/alert_status_TN.csv"
@@ -7,23 +9,16 @@ OUTPUT_FILE = "analysis/alert_status_TN.csv"
 # -------- LOAD DATA --------
 df = pd.read_csv(INPUT_FILE)
 
-# -------- CALCULATE THRESHOLD --------
-mean_upload = df["Total_Upload"].mean()
-std_upload = df["Total_Upload"].std()
-
-heavy_threshold = mean_upload + 2 * std_upload
+# -------- CALCULATE THRESHOLDS (PER DISTRICT) --------
+levels = {"heavy": LEVELS["heavy"]}
+stats, district_codes = district_thresholds(df, levels)
 
 # -------- ALERT FLAG LOGIC --------
-def generate_alert(upload):
-    if upload > heavy_threshold:
-        return "HIGH LOAD ALERT"
-    else:
-        return "NORMAL"
-
-df["Alert_Status"] = df["Total_Upload"].apply(generate_alert)
+df["Alert_Status"] = flag_months(df, stats, district_codes, levels)["Alert_Status"]
 
 # -------- SAVE --------
 df.to_csv(OUTPUT_FILE, index=False)
 
 print("✅ Alert generation completed")
-print("Heavy Threshold:", round(heavy_threshold, 2))
+for row in stats.itertuples(index=False):
+    print(f"Heavy Threshold ({row.district}):", round(row.heavy_threshold, 2))
@@ -1,6 +1,8 @@
 import os
 import pandas as pd
 
+from uidai_columnar import COLUMNAR_SUPPORTED, cache_info, convert
+
 print("SCRIPT STARTED\n")
 
 data_path = "data"
@@ -9,22 +11,26 @@ print("FILES INSIDE data FOLDER:\n")
 for file in os.listdir(data_path):
     print(repr(file))
 
-print("\n--- Loading CSV files ---\n")
-
-# ---- Tamil Nadu (Chennai) ----
-tn_enrol = pd.read_csv("data/Aadhaar Enrolment-TN.csv")
-tn_bio   = pd.read_csv("data/Aadhaar Biometric-TN.csv")
-tn_demo  = pd.read_csv("data/Aadhaar Demographic-TN.csv")
-
-# ---- Andhra Pradesh (Tirupati) ----
-ap_enrol = pd.read_csv("data/Aadhaar Monthly Enrolment-AP.csv")
-ap_bio   = pd.read_csv("data/Aadhaar Biometric-AP.csv")
-ap_demo  = pd.read_csv("data/Aadhaar Demographic -AP.csv")
-
-print("Tamil Nadu Enrolment shape:", tn_enrol.shape)
-print("Tamil Nadu Biometric shape:", tn_bio.shape)
-print("Tamil Nadu Demographic shape:", tn_demo.shape)
-
-print("Andhra Pradesh Enrolment shape:", ap_enrol.shape)
-print("Andhra Pradesh Biometric shape:", ap_bio.shape)
-print("Andhra Pradesh Demographic shape:", ap_demo.shape)
+SOURCES = {
+    # ---- Tamil Nadu (Chennai) ----
+    "Tamil Nadu Enrolment": "data/Aadhaar Enrolment-TN.csv",
+    "Tamil Nadu Biometric": "data/Aadhaar Biometric-TN.csv",
+    "Tamil Nadu Demographic": "data/Aadhaar Demographic-TN.csv",
+    # ---- Andhra Pradesh (Tirupati) ----
+    "Andhra Pradesh Enrolment": "data/Aadhaar Monthly Enrolment-AP.csv",
+    "Andhra Pradesh Biometric": "data/Aadhaar Biometric-AP.csv",
+    "Andhra Pradesh Demographic": "data/Aadhaar Demographic -AP.csv",
+}
+
+if not COLUMNAR_SUPPORTED:
+    print("\n--- Loading CSV files (install pyarrow to build the columnar cache) ---\n")
+    for label, path in SOURCES.items():
+        print(f"{label} shape:", pd.read_csv(path).shape)
+else:
+    # Parse each CSV once into the typed Parquet cache the later steps read.
+    print("\n--- Converting CSV files to the columnar cache ---\n")
+    for label, path in SOURCES.items():
+        cache_path, converted = convert(path)
+        info = cache_info(path)
+        status = "converted" if converted else "up to date"
+        print(f"{label} shape:", (info["num_rows"], len(info["source_columns"])), f"-> {cache_path} ({status})")
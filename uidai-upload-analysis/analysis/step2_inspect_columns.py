@@ -1,15 +1,21 @@
 import pandas as pd
 
-# Load one dataset from each type (TN only for inspection)
-tn_enrol = pd.read_csv("data/Aadhaar Enrolment-TN.csv")
-tn_bio   = pd.read_csv("data/Aadhaar Biometric-TN.csv")
-tn_demo  = pd.read_csv("data/Aadhaar Demographic-TN.csv")
+from uidai_columnar import COLUMNAR_SUPPORTED, cache_info, convert
 
-print("\n--- TN ENROLMENT COLUMNS ---")
-print(tn_enrol.columns)
+# Inspect one dataset from each type (TN only for inspection)
+files = {
+    "TN ENROLMENT": "data/Aadhaar Enrolment-TN.csv",
+    "TN BIOMETRIC": "data/Aadhaar Biometric-TN.csv",
+    "TN DEMOGRAPHIC": "data/Aadhaar Demographic-TN.csv",
+}
 
-print("\n--- TN BIOMETRIC COLUMNS ---")
-print(tn_bio.columns)
+for label, path in files.items():
+    if COLUMNAR_SUPPORTED:
+        # Column names come from the cache metadata; no rows are loaded.
+        convert(path)
+        columns = pd.Index(cache_info(path)["source_columns"])
+    else:
+        columns = pd.read_csv(path, nrows=0).columns
 
-print("\n--- TN DEMOGRAPHIC COLUMNS ---")
-print(tn_demo.columns)
+    print(f"\n--- {label} COLUMNS ---")
+    print(columns)
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from uidai_anomaly import LEVELS, district_thresholds, flag_months, print_thresholds
+
 print("\nSTEP 5B: DETECTING HEAVY UPLOAD MONTHS (TIRUPATI)\n")
 
 # ------------------------------------------------
@@ -11,20 +13,16 @@ df = pd.read_csv("analysis/monthly_total_upload_AP.csv")
 df["month"] = pd.to_datetime(df["month"])
 
 # ------------------------------------------------
-# CALCULATE STATISTICS
+# CALCULATE STATISTICS (PER DISTRICT)
 # ------------------------------------------------
-mean_upload = df["Total_Upload"].mean()
-std_upload  = df["Total_Upload"].std()
-threshold  = mean_upload + 2 * std_upload
-
-print(f"Mean Upload     : {mean_upload:.2f}")
-print(f"Std Deviation   : {std_upload:.2f}")
-print(f"Heavy Threshold : {threshold:.2f}\n")
+levels = {"heavy": LEVELS["heavy"]}
+stats, district_codes = district_thresholds(df, levels)
+print_thresholds(stats, "heavy")
 
 # ------------------------------------------------
 # FLAG HEAVY MONTHS
 # ------------------------------------------------
-df["is_heavy"] = df["Total_Upload"] > threshold
+df["is_heavy"] = flag_months(df, stats, district_codes, levels)["heavy"]
 
 # ------------------------------------------------
 # SAVE RESULTS
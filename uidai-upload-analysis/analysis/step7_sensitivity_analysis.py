@@ -1,5 +1,7 @@
 import pandas as pd
 
+from uidai_anomaly import LEVELS, district_thresholds, flag_months
+
 print("\nSTEP 7: SENSITIVITY ANALYSIS (MEAN + 1.5σ)\n")
 
 # ------------------------------------------------
@@ -14,18 +16,20 @@ tirupati["month"] = pd.to_datetime(tirupati["month"])
 # ------------------------------------------------
 # FUNCTION TO FLAG SENSITIVE HEAVY MONTHS
 # ------------------------------------------------
+levels = {"sensitive": LEVELS["sensitive"]}
+
 def detect_sensitive_heavy(df, label):
-    mean_val = df["Total_Upload"].mean()
-    std_val = df["Total_Upload"].std()
-    threshold = mean_val + 1.5 * std_val
+    stats, district_codes = district_thresholds(df, levels)
 
     df = df.copy()
-    df["sensitive_heavy"] = df["Total_Upload"] > threshold
+    df["sensitive_heavy"] = flag_months(df, stats, district_codes, levels, "sensitive")["sensitive"]
 
     print(f"\n{label}")
-    print(f"Mean       : {mean_val:.2f}")
-    print(f"Std Dev    : {std_val:.2f}")
-    print(f"Threshold  : {threshold:.2f}")
+    for row in stats.itertuples(index=False):
+        print(f"District   : {row.district}")
+        print(f"Mean       : {row.mean:.2f}")
+        print(f"Std Dev    : {row.std:.2f}")
+        print(f"Threshold  : {row.sensitive_threshold:.2f}")
 
     flagged = df[df["sensitive_heavy"] == True]
 
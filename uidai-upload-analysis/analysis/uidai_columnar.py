@@ -0,0 +1,151 @@
+"""Typed columnar cache of the raw UIDAI daily CSVs.
+
+Each source CSV is parsed once into ``columnar/<name>.parquet`` next to it:
+state and district are dictionary-encoded, ``date`` is stored parsed
+(day first, as the analysis steps read it) next to its ``month``
+(``YYYY-MM``, ``NaT`` when the date did not parse) and counts are int32.
+Rows are sorted by state, district and date so filters on those columns
+skip whole row groups. A cache file records the size and mtime of the CSV
+it was built from and is rebuilt when they change.
+
+Later steps call ``read_columnar`` with only the columns they need and
+optional pyarrow ``filters``.
+
+    python analysis/uidai_columnar.py          # convert every file in data/
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: steps fall back to parsing the CSVs
+    pa = None
+    pq = None
+
+COLUMNAR_SUPPORTED = pq is not None
+CACHE_SUBDIR = "columnar"
+ROW_GROUP_ROWS = 128 * 1024
+_METADATA_KEY = b"uidai_source"
+
+_CATEGORY_COLUMNS = ["state", "district", "date"]
+
+
+def cache_path(csv_path, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(csv_path), CACHE_SUBDIR)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{name}.parquet")
+
+
+def _stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cache_info(csv_path, cache_dir=None):
+    """Metadata stored with the cache file, or None if it is missing or stale."""
+    path = cache_path(csv_path, cache_dir)
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    info = json.loads(metadata.get(_METADATA_KEY, b"{}"))
+    if info.get("stamp") != _stamp(csv_path):
+        return None
+    return {**info, "num_rows": pq.read_metadata(path).num_rows}
+
+
+def convert(csv_path, cache_dir=None, force=False):
+    """Parse ``csv_path`` into its cache file unless an up-to-date one exists."""
+    if not force and cache_info(csv_path, cache_dir) is not None:
+        return cache_path(csv_path, cache_dir), False
+
+    stamp = _stamp(csv_path)
+    df = pd.read_csv(csv_path, dtype={column: "category" for column in _CATEGORY_COLUMNS})
+    source_columns = list(df.columns)
+
+    # Daily files repeat a few hundred distinct dates; parse each one once.
+    # Code -1 (missing date) maps to NaT.
+    categories = df["date"].cat.categories
+    codes = df["date"].cat.codes.to_numpy()
+    parsed = pd.to_datetime(categories, dayfirst=True, errors="coerce")
+    dates = np.append(parsed.to_numpy(), np.datetime64("NaT"))[codes]
+    months = np.append(parsed.to_period("M").astype(str).to_numpy(dtype=object), "NaT")[codes]
+    df["date"] = dates
+    df["month"] = pd.Categorical(months)
+
+    df = df.sort_values(["state", "district", "date"], kind="stable", ignore_index=True)
+
+    # Counts become int32; a column with blanks becomes nullable Int32.
+    for column in df.columns:
+        values = df[column]
+        if column in _CATEGORY_COLUMNS or not pd.api.types.is_numeric_dtype(values):
+            continue
+        present = values.dropna()
+        if present.empty or not (present % 1 == 0).all():
+            continue
+        if present.min() >= np.iinfo(np.int32).min and present.max() <= np.iinfo(np.int32).max:
+            df[column] = values.astype("Int32" if values.isna().any() else "int32")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    info = {
+        "stamp": stamp,
+        "source_columns": source_columns,
+        "districts": sorted(str(d) for d in df["district"].dropna().unique()),
+    }
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _METADATA_KEY: json.dumps(info).encode()}
+    )
+
+    path = cache_path(csv_path, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS, compression="zstd")
+    os.replace(tmp_path, path)
+    return path, True
+
+
+def district_filter(csv_path, contains, cache_dir=None):
+    """Pushdown filter for districts containing ``contains`` (case-insensitive)."""
+    info = cache_info(csv_path, cache_dir) or {}
+    districts = info.get("districts")
+    if districts is None:
+        convert(csv_path, cache_dir)
+        districts = cache_info(csv_path, cache_dir)["districts"]
+    matches = [d for d in districts if contains.casefold() in d.casefold()]
+    return [("district", "in", matches)]
+
+
+def read_columnar(csv_path, columns=None, filters=None, cache_dir=None):
+    """Load ``columns`` of the cached source, converting it first if needed."""
+    path, _ = convert(csv_path, cache_dir)
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--cache-dir", default=None, help="default: <data-dir>/columnar")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the cache is up to date")
+    args = parser.parse_args()
+
+    if not COLUMNAR_SUPPORTED:
+        raise SystemExit("pyarrow is required for the columnar cache")
+
+    for name in sorted(os.listdir(args.data_dir)):
+        if not name.endswith(".csv"):
+            continue
+        start = time.perf_counter()
+        path, converted = convert(os.path.join(args.data_dir, name), args.cache_dir, args.force)
+        status = f"converted in {time.perf_counter() - start:.2f}s" if converted else "up to date"
+        print(f"{name} -> {path} ({status})")
+
+
+if __name__ == "__main__":
+    main()
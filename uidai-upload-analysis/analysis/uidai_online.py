@@ -0,0 +1,261 @@
+"""Raise HIGH LOAD ALERTs as new monthly or daily totals arrive.
+
+Steps 4 and 10 recompute each district's mean + 2 std over its whole
+history on every run. This detector keeps, per district, a running mean
+and variance of its completed months (Welford's algorithm, or an
+exponentially weighted mean and variance with ``--halflife``) together
+with the total of the month in progress. Every datapoint is an O(1)
+update:
+
+* a month-to-date total (``observe``) or a daily amount (``add``) updates
+  the open month, which raises HIGH LOAD ALERT the first time it exceeds
+  mean + k std of the district's earlier months;
+* a datapoint for a later month first folds the open month's total into
+  the running statistics.
+
+Unlike the batch steps, a month is judged against the months before it,
+not against statistics that include it, and only once the district has
+``--min-months`` completed months. Datapoints for months before the open
+one are late; they are reported and left out of the statistics.
+
+``Total_Upload`` is the sum of all three sources, so the daily rows of one
+run are summed across sources per district and month before they are
+added. Daily rows for months a monthly file already covered are skipped,
+since the monthly total counts them.
+
+State lives in ``analysis/online/state.json`` and alerts are appended to
+``analysis/online/alerts.csv``. Run from the uidai-upload-analysis
+directory:
+
+    python analysis/uidai_online.py                 # fold in monthly_total_upload_*.csv
+    python analysis/uidai_online.py --halflife 6
+    python analysis/uidai_online.py --daily enrolment data/new_enrolment_rows.csv \
+        --daily biometric data/new_biometric_rows.csv
+
+Monthly files can be folded in again after each pipeline run: months
+already seen are skipped and the open month's total is replaced. Daily
+amounts are added, so pass only rows not fed in before, and pass every
+source's new rows in the same run.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+
+import pandas as pd
+
+from uidai_anomaly import ALERT, LEVELS, VALUE
+from uidai_pipeline import SOURCES, read_source
+
+STATE_DIR = os.path.join("analysis", "online")
+MIN_MONTHS = 3
+
+
+class OnlineDetector:
+    """Per-district running statistics with O(1) updates.
+
+    Each district entry holds ``n`` completed months, their ``mean`` and
+    ``m2`` (the sum of squared deviations, or with decay the exponentially
+    weighted variance itself), the open ``month``, its ``total`` so far,
+    whether it has ``alerted`` and the last ``monthly`` month observed from
+    a monthly file.
+    """
+
+    def __init__(self, sigma=LEVELS["heavy"][1], halflife=None, min_months=MIN_MONTHS, districts=None):
+        self.sigma = sigma
+        self.halflife = halflife
+        self.alpha = None if halflife is None else 1 - 0.5 ** (1 / halflife)
+        self.min_months = max(min_months, 2)
+        self.districts = districts if districts is not None else {}
+        self.late = 0
+        self.covered = 0
+
+    @classmethod
+    def load(cls, path, log=print, **options):
+        detector = cls(**options)
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("halflife") != detector.halflife:
+                log(f"{path}: saved with halflife {saved.get('halflife')}; starting fresh statistics")
+            else:
+                detector.districts = saved["districts"]
+        return detector
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"halflife": self.halflife, "districts": self.districts}, f)
+        os.replace(tmp_path, path)
+
+    def threshold(self, entry):
+        """mean + sigma * std of the completed months, or None while warming up."""
+        n = entry["n"]
+        if n < self.min_months:
+            return None
+        variance = entry["m2"] if self.alpha is not None else entry["m2"] / (n - 1)
+        return entry["mean"] + self.sigma * math.sqrt(variance)
+
+    def _fold(self, entry, value):
+        n = entry["n"] + 1
+        delta = value - entry["mean"]
+        if self.alpha is None:
+            entry["mean"] += delta / n
+            entry["m2"] += delta * (value - entry["mean"])
+        elif n == 1:
+            entry["mean"], entry["m2"] = float(value), 0.0
+        else:
+            increment = self.alpha * delta
+            entry["mean"] += increment
+            entry["m2"] = (1 - self.alpha) * (entry["m2"] + delta * increment)
+        entry["n"] = n
+
+    def _open(self, state, district, month):
+        """The district's entry with ``month`` open, or None if ``month`` is late."""
+        key = f"{state}\t{district}"
+        entry = self.districts.get(key)
+        if entry is None:
+            entry = {"n": 0, "mean": 0.0, "m2": 0.0, "month": None, "total": 0, "alerted": False}
+            self.districts[key] = entry
+        if entry["month"] is None or month > entry["month"]:
+            if entry["month"] is not None:
+                self._fold(entry, entry["total"])
+            entry.update(month=month, total=0, alerted=False)
+        elif month < entry["month"]:
+            return None
+        return entry
+
+    def _check(self, state, district, entry):
+        threshold = self.threshold(entry)
+        if entry["alerted"] or threshold is None or not entry["total"] > threshold:
+            return None
+        entry["alerted"] = True
+        return {
+            "state": state,
+            "district": district,
+            "month": entry["month"],
+            VALUE: entry["total"],
+            "threshold": round(threshold, 2),
+            "Alert_Status": ALERT,
+        }
+
+    def observe(self, state, district, month, total):
+        """Set the month-to-date total; returns an alert record or None."""
+        if month == "NaT":
+            return None
+        entry = self._open(state, district, month)
+        if entry is None:
+            return None  # already folded in on an earlier run
+        entry["total"] = int(total)
+        entry["monthly"] = month
+        return self._check(state, district, entry)
+
+    def add(self, state, district, month, amount):
+        """Add a daily amount to its month; returns an alert record or None.
+
+        ``amount`` should cover every source, as ``Total_Upload`` does.
+        """
+        if month == "NaT" or pd.isna(amount):
+            return None
+        known = self.districts.get(f"{state}\t{district}")
+        if known is not None and known.get("monthly") is not None and month <= known["monthly"]:
+            self.covered += 1
+            return None
+        entry = self._open(state, district, month)
+        if entry is None:
+            self.late += 1
+            return None
+        entry["total"] += int(round(amount))
+        return self._check(state, district, entry)
+
+
+def feed_monthly(detector, paths):
+    alerts = []
+    for path in paths:
+        monthly = pd.read_csv(path, usecols=["state", "district", "month", VALUE])
+        # Step 4 style files hold YYYY-MM-01; the detector keys on YYYY-MM.
+        monthly["month"] = monthly["month"].astype(str).str[:7]
+        for state, district, month, total in monthly.sort_values("month").itertuples(index=False):
+            alert = detector.observe(state, district, month, total)
+            if alert:
+                alerts.append(alert)
+    return alerts
+
+
+def daily_upload_totals(files):
+    """``state, district, month, Total_Upload`` summed over ``(source, path)`` pairs, in month order."""
+    frames = [
+        read_source(path, source).rename(columns={SOURCES[source][1]: VALUE})
+        for source, path in files
+    ]
+    daily = pd.concat(frames, ignore_index=True)
+    # min_count=1 keeps a month whose rows all lack a total missing, not 0.
+    return (
+        daily.groupby(["state", "district", "month"], sort=False)[VALUE]
+        .sum(min_count=1)
+        .reset_index()
+        .sort_values("month", kind="stable")
+    )
+
+
+def feed_daily(detector, files):
+    """Add the daily rows of ``(source, path)`` pairs; returns the alerts."""
+    alerts = []
+    for state, district, month, amount in daily_upload_totals(files).itertuples(index=False):
+        alert = detector.add(state, district, month, amount)
+        if alert:
+            alerts.append(alert)
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--monthly", nargs="*", default=None, help="default: analysis/monthly_total_upload_*.csv")
+    parser.add_argument("--daily", nargs=2, action="append", metavar=("SOURCE", "CSV"), default=[],
+                        help=f"new daily rows of a source ({', '.join(SOURCES)})")
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    parser.add_argument("--sigma", type=float, default=LEVELS["heavy"][1])
+    parser.add_argument("--halflife", type=float, default=None, help="months; weight recent months more")
+    parser.add_argument("--min-months", type=int, default=MIN_MONTHS)
+    args = parser.parse_args()
+
+    for source, _ in args.daily:
+        if source not in SOURCES:
+            parser.error(f"unknown source {source!r}")
+
+    state_path = os.path.join(args.state_dir, "state.json")
+    detector = OnlineDetector.load(
+        state_path, sigma=args.sigma, halflife=args.halflife, min_months=args.min_months
+    )
+
+    print("\nUIDAI ONLINE LOAD ALERTS\n")
+    alerts = []
+    if args.daily:
+        alerts += feed_daily(detector, args.daily)
+    else:
+        paths = args.monthly if args.monthly is not None else sorted(glob.glob("analysis/monthly_total_upload_*.csv"))
+        alerts += feed_monthly(detector, paths)
+    detector.save(state_path)
+
+    for alert in alerts:
+        print(
+            f"{alert['Alert_Status']}: {alert['district']} ({alert['state']}) {alert['month']} "
+            f"{alert[VALUE]} > {alert['threshold']:.2f}"
+        )
+    if alerts:
+        alerts_path = os.path.join(args.state_dir, "alerts.csv")
+        pd.DataFrame(alerts).to_csv(alerts_path, mode="a", header=not os.path.exists(alerts_path), index=False)
+    else:
+        print("No new high load alerts.")
+    if detector.late:
+        print(f"{detector.late} late daily district-months for months already closed were skipped")
+    if detector.covered:
+        print(f"{detector.covered} daily district-months already in the monthly totals were skipped")
+    print(f"\n{len(detector.districts)} districts tracked in {state_path}")
+    print("\nONLINE ALERTS COMPLETED SUCCESSFULLY ✅")
+
+
+if __name__ == "__main__":
+    main()
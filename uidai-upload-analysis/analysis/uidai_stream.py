@@ -0,0 +1,239 @@
+"""Out-of-core monthly aggregation for sources larger than memory.
+
+Each source is split into byte ranges (CSV) or row groups (an existing
+columnar cache file) and every range is read in chunks of ``chunk_rows``
+rows by a worker process. A worker keeps only a ``(state, district,
+month) -> total`` accumulator, whose size depends on the number of
+districts and months rather than on the input, and the parent adds the
+workers' partial accumulators together. Peak memory is therefore one
+chunk per worker plus the accumulators. Results match uidai_pipeline.py.
+
+Run from the uidai-upload-analysis directory:
+
+    python analysis/uidai_stream.py --state TN
+    python analysis/uidai_stream.py \\
+        --enrolment "data/Aadhaar Enrolment-IN.csv" \\
+        --biometric "data/Aadhaar Biometric-IN.csv" \\
+        --demographic "data/Aadhaar Demographic-IN.csv" \\
+        --output analysis/monthly_total_upload_IN.csv --workers 4
+
+The columnar cache is used only if it is already up to date; building it
+(uidai_columnar.py) loads the whole CSV, so national files are streamed
+from the CSV instead.
+"""
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from uidai_columnar import COLUMNAR_SUPPORTED, cache_info, cache_path, pq
+from uidai_pipeline import (
+    KEYS,
+    OUTPUT_DIR,
+    SOURCES,
+    STATES,
+    csv_dtypes,
+    daily_totals,
+    merge_sources,
+    monthly_totals,
+    state_files,
+)
+
+CHUNK_ROWS = 250_000
+
+
+class _RangeReader(io.RawIOBase):
+    """Bytes ``[start, end)`` of a file, as a stream pandas can read."""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def csv_ranges(path, parts):
+    """Header names and ``parts`` line-aligned byte ranges of the CSV body."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as handle:
+        names = handle.readline().decode("utf-8-sig").strip().split(",")
+        body = handle.tell()
+        bounds = [body]
+        for i in range(1, parts):
+            handle.seek(max(bounds[-1], body + (size - body) * i // parts))
+            if handle.tell() > body:
+                # Move to the start of the next line.
+                handle.seek(handle.tell() - 1)
+                handle.readline()
+            bounds.append(handle.tell())
+        bounds.append(size)
+    return names, [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def parquet_ranges(path, parts):
+    groups = list(range(pq.ParquetFile(path).num_row_groups))
+    return [groups[i::parts] for i in range(parts) if groups[i::parts]]
+
+
+def _accumulate(accumulator, monthly):
+    for state, district, month, total in monthly.itertuples(index=False, name=None):
+        key = (state, district, month)
+        accumulator[key] = accumulator.get(key, 0) + int(total)
+
+
+def _stream_csv(task):
+    path, source, district, chunk_rows, names, (start, end) = task
+    age_columns, total_column = SOURCES[source]
+    accumulator, rows = {}, 0
+    with io.BufferedReader(_RangeReader(path, start, end), buffer_size=1 << 20) as reader:
+        chunks = pd.read_csv(
+            reader,
+            header=None,
+            names=names,
+            usecols=["state", "district", "date", *age_columns],
+            dtype=csv_dtypes(source),
+            chunksize=chunk_rows,
+        )
+        for chunk in chunks:
+            rows += len(chunk)
+            _accumulate(accumulator, monthly_totals(daily_totals(chunk, source, district), total_column))
+    return source, accumulator, rows
+
+
+def _stream_parquet(task):
+    path, source, district, chunk_rows, row_groups = task
+    age_columns, total_column = SOURCES[source]
+    accumulator, rows = {}, 0
+    batches = pq.ParquetFile(path).iter_batches(
+        batch_size=chunk_rows,
+        row_groups=row_groups,
+        columns=["state", "district", "month", *age_columns],
+    )
+    for batch in batches:
+        df = batch.to_pandas()
+        rows += len(df)
+        if district is not None:
+            df = df[df["district"].str.contains(district, case=False, na=False)]
+        total = df[age_columns[0]].astype("float64")
+        for column in age_columns[1:]:
+            total = total + df[column]
+        daily = pd.DataFrame(
+            {"state": df["state"], "district": df["district"], "month": df["month"], total_column: total}
+        )
+        _accumulate(accumulator, monthly_totals(daily, total_column))
+    return source, accumulator, rows
+
+
+def _run_task(task):
+    kind, args = task
+    return _stream_csv(args) if kind == "csv" else _stream_parquet(args)
+
+
+def _accumulator_frame(accumulator, total_column):
+    monthly = pd.DataFrame(
+        [(*key, total) for key, total in accumulator.items()],
+        columns=[*KEYS, total_column],
+    )
+    monthly[total_column] = monthly[total_column].astype("int64")
+    return monthly.sort_values(KEYS, ignore_index=True)
+
+
+def plan_tasks(files, district=None, chunk_rows=CHUNK_ROWS, parts=1, use_cache=True):
+    tasks = []
+    for source, path in files.items():
+        if use_cache and COLUMNAR_SUPPORTED and cache_info(path) is not None:
+            for row_groups in parquet_ranges(cache_path(path), parts):
+                tasks.append(("parquet", (cache_path(path), source, district, chunk_rows, row_groups)))
+        else:
+            names, ranges = csv_ranges(path, parts)
+            for byte_range in ranges:
+                tasks.append(("csv", (path, source, district, chunk_rows, names, byte_range)))
+    return tasks
+
+
+def aggregate_streaming(files, district=None, chunk_rows=CHUNK_ROWS, workers=None, use_cache=True):
+    """Monthly totals for ``{source: csv path}`` in bounded memory.
+
+    Returns the merged frame and the number of source rows read.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_tasks(files, district, chunk_rows, workers, use_cache)
+    accumulators = {source: {} for source in files}
+    rows = 0
+
+    if workers <= 1:
+        results = map(_run_task, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_run_task, tasks)
+    try:
+        for source, partial, partial_rows in results:
+            target = accumulators[source]
+            for key, total in partial.items():
+                target[key] = target.get(key, 0) + total
+            rows += partial_rows
+    finally:
+        if workers > 1:
+            executor.shutdown()
+
+    monthly = {
+        source: _accumulator_frame(accumulator, SOURCES[source][1])
+        for source, accumulator in accumulators.items()
+    }
+    return merge_sources(monthly), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--state", choices=list(STATES), help="aggregate this state's files from --data-dir")
+    parser.add_argument("--data-dir", default="data")
+    for source in SOURCES:
+        parser.add_argument(f"--{source}", help=f"{source} CSV (instead of --state)")
+    parser.add_argument("--district", help="keep districts containing this text (default: the state's filter)")
+    parser.add_argument("--output", help="default: analysis/monthly_total_upload_<STATE>.csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="stream the CSVs even if a columnar cache exists")
+    args = parser.parse_args()
+
+    if args.state:
+        files = state_files(args.state, args.data_dir)
+        district = args.district or STATES[args.state]["district"]
+        output = args.output or os.path.join(OUTPUT_DIR, f"monthly_total_upload_{args.state}.csv")
+    else:
+        files = {source: getattr(args, source) for source in SOURCES}
+        if not all(files.values()) or not args.output:
+            parser.error("pass --state, or all three source files and --output")
+        district = args.district
+
+    print("\nUIDAI STREAMING AGGREGATION\n")
+    start = time.perf_counter()
+    merged, rows = aggregate_streaming(files, district, args.chunk_rows, args.workers, not args.no_cache)
+    seconds = time.perf_counter() - start
+    merged.to_csv(output, index=False)
+
+    print(f"{rows} source rows -> {len(merged)} district-months -> {output}")
+    print(f"{seconds:.2f}s ({rows / seconds:.0f} rows/sec)")
+    print("\nSTREAMING AGGREGATION COMPLETED SUCCESSFULLY ✅")
+
+
+if __name__ == "__main__":
+    main()
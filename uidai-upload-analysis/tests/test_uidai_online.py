@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "analysis"))
+
+from uidai_anomaly import VALUE  # noqa: E402
+from uidai_online import OnlineDetector, feed_daily, feed_monthly  # noqa: E402
+
+STATE, DISTRICT = "Tamil Nadu", "Chennai"
+KEY = f"{STATE}\t{DISTRICT}"
+
+
+def _daily(tmp_path, source, rows):
+    """Write ``(date, count)`` rows of one source, its count in the first age column."""
+    columns = {
+        "enrolment": ["age_0_5", "age_5_17", "age_18_greater"],
+        "biometric": ["bio_age_5_17", "bio_age_17_"],
+        "demographic": ["demo_age_5_17", "demo_age_17_"],
+    }[source]
+    frame = pd.DataFrame(
+        [{"date": date, "state": STATE, "district": DISTRICT, columns[0]: count,
+          **{column: 0 for column in columns[1:]}} for date, count in rows]
+    )
+    path = tmp_path / f"{source}.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def _monthly(tmp_path, totals):
+    path = tmp_path / "monthly_total_upload_TN.csv"
+    pd.DataFrame(
+        [{"state": STATE, "district": DISTRICT, "month": f"{month}-01", VALUE: total}
+         for month, total in totals.items()]
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def test_sources_are_summed_before_months_close(tmp_path):
+    detector = OnlineDetector(min_months=2)
+    # The enrolment file reaches a later month than the biometric one.
+    enrolment = _daily(tmp_path, "enrolment", [("01-01-2025", 60), ("01-02-2025", 70), ("01-03-2025", 80)])
+    biometric = _daily(tmp_path, "biometric", [("15-01-2025", 40), ("15-02-2025", 30)])
+
+    feed_daily(detector, [("enrolment", enrolment), ("biometric", biometric)])
+
+    entry = detector.districts[KEY]
+    assert detector.late == 0
+    assert entry["n"] == 2
+    assert entry["mean"] == pytest.approx(100)
+    assert (entry["month"], entry["total"]) == ("2025-03", 80)
+
+
+def test_daily_rows_for_monthly_months_are_not_double_counted(tmp_path):
+    detector = OnlineDetector(min_months=2)
+    feed_monthly(detector, [_monthly(tmp_path, {"2025-01": 100000, "2025-02": 102000})])
+    enrolment = _daily(tmp_path, "enrolment", [("20-02-2025", 5000), ("03-03-2025", 81300)])
+    biometric = _daily(tmp_path, "biometric", [("21-02-2025", 3000), ("04-03-2025", 20000)])
+
+    feed_daily(detector, [("enrolment", enrolment), ("biometric", biometric)])
+
+    entry = detector.districts[KEY]
+    assert detector.covered == 1
+    assert entry["n"] == 2
+    assert entry["mean"] == pytest.approx(101000)
+    assert (entry["month"], entry["total"]) == ("2025-03", 101300)
+
+
+def test_monthly_rerun_after_daily_keeps_statistics(tmp_path):
+    detector = OnlineDetector(min_months=2)
+    monthly = _monthly(tmp_path, {"2025-01": 100, "2025-02": 120})
+    feed_monthly(detector, [monthly])
+    feed_daily(detector, [("enrolment", _daily(tmp_path, "enrolment", [("02-03-2025", 50)]))])
+    feed_monthly(detector, [_monthly(tmp_path, {"2025-01": 100, "2025-02": 120, "2025-03": 130})])
+
+    entry = detector.districts[KEY]
+    assert entry["n"] == 2
+    assert entry["mean"] == pytest.approx(110)
+    assert (entry["month"], entry["total"]) == ("2025-03", 130)
+
+
+def test_alert_uses_all_sources(tmp_path):
+    detector = OnlineDetector(min_months=2)
+    feed_monthly(detector, [_monthly(tmp_path, {"2025-01": 100, "2025-02": 110, "2025-03": 90})])
+    enrolment = _daily(tmp_path, "enrolment", [("01-04-2025", 80)])
+    biometric = _daily(tmp_path, "biometric", [("01-04-2025", 80)])
+
+    alerts = feed_daily(detector, [("enrolment", enrolment), ("biometric", biometric)])
+
+    assert [(alert["month"], alert[VALUE]) for alert in alerts] == [("2025-04", 160)]